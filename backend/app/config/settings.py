@@ -1,5 +1,9 @@
+import json
+import os
+from functools import cache
+from dotenv import dotenv_values
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from typing import List, Optional
 
 class Settings(BaseSettings):
@@ -27,6 +31,8 @@ class Settings(BaseSettings):
 
     # Fetching Intervals (seconds)
     FETCH_INTERVAL: int = Field(120, description="Seconds between live price fetches (free tier safe)")
+    LIVE_FETCH_CONCURRENCY: int = Field(5, description="Max live price requests in flight at once")
+    HISTORY_FETCH_CONCURRENCY: int = Field(4, description="Max history downloads in flight at once")
     PREDICT_INTERVAL: int = Field(10, description="Seconds between AI predictions")
     ALERT_INTERVAL: int = Field(15, description="Seconds between alert checks (match fetch interval)")
     HOURLY_HISTORY_PERIOD: str = Field("60d", description="Period of hourly history to preload")
@@ -45,6 +51,13 @@ class Settings(BaseSettings):
     MODEL_FILE: str = Field("xgb_model.json", description="XGBoost model filename")
     SCALER_FILE: str = Field("scaler.joblib", description="Scaler filename")
     MODEL_META_FILE: str = Field("model_meta.json", description="Model metadata filename")
+    MODEL_RELOAD_INTERVAL: int = Field(60, description="Seconds between checks for newer model artifacts in non-leader workers")
+    USE_GPU: bool = Field(False, description="Train XGBoost on CUDA when available")
+    USE_ONNX: bool = Field(True, description="Serve predictions through onnxruntime when installed")
+    MARKET_RETURNS_CACHE_SECONDS: int = Field(3600, description="Max age of the on-disk market returns cache")
+    HISTORY_CACHE_DIR: str = Field("cache", description="Directory for cached Yahoo Finance history")
+    HOURLY_HISTORY_CACHE_SECONDS: int = Field(900, description="Max age of cached hourly history; keep below HOURLY_REFRESH_INTERVAL")
+    DAILY_HISTORY_CACHE_SECONDS: int = Field(86400, description="Max age of cached daily history")
 
     # Redis
     REDIS_HOST: str = Field("localhost", description="Redis host")
@@ -61,6 +74,59 @@ class Settings(BaseSettings):
     # Websocket
     WEBSOCKET_BROADCAST_INTERVAL: int = Field(1, description="Seconds between websocket broadcast pushes")
 
+    # Membership index for SYMBOLS (kept in sync by add_symbol)
+    _symbols_set: set = PrivateAttr(default_factory=set)
+
+    def model_post_init(self, __context) -> None:
+        self._symbols_set = set(self.SYMBOLS)
+
+    def add_symbol(self, symbol: str) -> bool:
+        """Track a new symbol, preserving SYMBOLS order. Returns False if already tracked."""
+        sym = symbol.upper()
+        if sym in self._symbols_set:
+            return False
+        self._symbols_set.add(sym)
+        self.SYMBOLS.append(sym)
+        return True
+
+
+def _coerce(value: str, annotation):
+    """Convert a raw env string to the field's declared type (int, bool, list or str)."""
+    if annotation is bool:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if annotation is int:
+        return int(value)
+    if annotation == List[str]:
+        value = value.strip()
+        if value.startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return value
+
+
+def load_settings(bypass_validators: bool = False) -> Settings:
+    """
+    Build Settings from the environment.
+    With bypass_validators, trusted values are coerced by hand and passed to
+    model_construct(), skipping Pydantic validation entirely.
+    """
+    if not bypass_validators:
+        return Settings()
+
+    raw = {k: v for k, v in dotenv_values(".env").items() if v is not None}
+    raw.update(os.environ)
+    values = {}
+    for name, field in Settings.model_fields.items():
+        if name in raw:
+            values[name] = _coerce(raw[name], field.annotation)
+    return Settings.model_construct(**values)
+
+
+@cache
+def get_settings() -> Settings:
+    """Return the process-wide Settings, validating the environment only once."""
+    return load_settings(bypass_validators=os.getenv("SETTINGS_BYPASS_VALIDATORS") == "1")
+
 
 # Global instance
-settings = Settings()
+settings = get_settings()
@@ -1,50 +1,149 @@
+import asyncio
+import base64
 import strawberry
 import io
-import matplotlib.pyplot as plt
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import pandas as pd
 from fastapi import HTTPException
 from ..services.price_cache import price_cache
 from ..models.predictor import predictor
 
-@strawberry.type
-class Mutation:
-    @strawberry.field
-    async def plot_stock(self, symbol: str) -> str:
-        symbol = symbol.upper()
-        await price_cache.connect()
+# -----------------------------
+# Lazy matplotlib: imported on the first render, not at GraphQL import time
+# -----------------------------
+_PLOT_IMPORTED = False
+_PLOT_IMPORT_LOCK = threading.Lock()
+Figure = None
+FigureCanvasAgg = None
 
-        prices, volumes, dates = await price_cache.get_hourly_history(symbol)
-        if not prices or not volumes or not dates:
-            raise HTTPException(status_code=400, detail=f"No hourly data loaded for {symbol}")
 
-        STEPS = 5
-        predicted = predictor.predict(prices, volumes, steps=STEPS, dates=dates)
-        high, low = predictor.predict_high_low(prices, volumes, steps=STEPS, dates=dates)
+def _import_plotting():
+    global _PLOT_IMPORTED, Figure, FigureCanvasAgg
+    if _PLOT_IMPORTED:
+        return
+    with _PLOT_IMPORT_LOCK:
+        if _PLOT_IMPORTED:
+            return
+        import matplotlib
+        matplotlib.use("Agg")
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as _Canvas
+        from matplotlib.figure import Figure as _Figure
+        Figure, FigureCanvasAgg = _Figure, _Canvas
+        _PLOT_IMPORTED = True
+
+
+# -----------------------------
+# Figure pool: reused across renders instead of a new pyplot figure per call.
+# Filled lazily as rendered figures are returned.
+# -----------------------------
+_FIG_POOL: queue.SimpleQueue = queue.SimpleQueue()
+
+
+def _new_figure():
+    _import_plotting()
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    return fig
+
+
+# -----------------------------
+# Render process pool: PNG encoding is CPU-bound and holds the GIL,
+# so it runs in separate processes. Created on the first render; workers
+# are spawned, not forked, since the server process already runs threads.
+# -----------------------------
+_PLOT_POOL: ProcessPoolExecutor | None = None
+
+
+def _get_plot_pool() -> ProcessPoolExecutor:
+    global _PLOT_POOL
+    if _PLOT_POOL is None:
+        _PLOT_POOL = ProcessPoolExecutor(
+            max_workers=2, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _PLOT_POOL
+
+
+def shutdown_plot_pool():
+    """Stop the render workers, if any were started."""
+    global _PLOT_POOL
+    if _PLOT_POOL is not None:
+        _PLOT_POOL.shutdown(wait=True, cancel_futures=True)
+        _PLOT_POOL = None
 
-        plt.figure(figsize=(12, 6))
-        dates_dt = pd.to_datetime(dates)
-        plt.plot(dates_dt, prices, label="Actual")
+
+@lru_cache(maxsize=64)
+def _parse_dates(dates: tuple) -> pd.DatetimeIndex:
+    """Parse a symbol's hourly date strings once; history rarely changes between calls."""
+    return pd.to_datetime(dates)
+
+
+def _render_png(dates, prices, predicted, high, low) -> bytes:
+    """
+    Render actual vs predicted prices to PNG bytes.
+    Runs in a render worker process; uses the object-oriented Agg API, not pyplot.
+    """
+    try:
+        fig = _FIG_POOL.get_nowait()
+    except queue.Empty:
+        fig = _new_figure()
+
+    try:
+        ax = fig.add_subplot(111)
+        dates_dt = _parse_dates(tuple(dates))
+        ax.plot(dates_dt, prices, label="Actual")
 
         last_date = dates_dt[-1]
         future_dates = pd.date_range(
             start=last_date + pd.Timedelta(hours=1),
             periods=len(predicted),
-            freq="H",
+            freq="h",
         )
 
-        plt.plot(future_dates, predicted, "--", label="Predicted")
-        plt.fill_between(future_dates, high, low, alpha=0.3, label="High / Low")
+        ax.plot(future_dates, predicted, "--", label="Predicted")
+        ax.fill_between(future_dates, high, low, alpha=0.3, label="High / Low")
 
-        all_dates = pd.to_datetime(list(dates_dt) + list(future_dates))
+        all_dates = dates_dt.append(future_dates)
         tick_dates = all_dates[::7]
-        plt.xticks(tick_dates, tick_dates.strftime("%Y-%m-%d %H:%M"), rotation=45)
+        ax.set_xticks(tick_dates)
+        ax.set_xticklabels(tick_dates.strftime("%Y-%m-%d %H:%M"), rotation=45)
 
-        plt.legend()
-        plt.grid(True)
+        ax.legend()
+        ax.grid(True)
 
         buf = io.BytesIO()
-        plt.savefig(buf, format="png", bbox_inches="tight")
-        plt.close()
-        buf.seek(0)
+        fig.savefig(buf, format="png", bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        fig.clf()
+        _FIG_POOL.put(fig)
+
 
-        return buf.getvalue().hex()
+@strawberry.type
+class Mutation:
+    @strawberry.field
+    async def plot_stock_png_b64(self, symbol: str) -> str:
+        """
+        Plot recent hourly prices with the predicted path and high/low band.
+        Returns the PNG image as a base64-encoded string.
+        """
+        symbol = symbol.upper()
+
+        prices, volumes, dates = await price_cache.get_hourly_history(symbol)
+        if len(prices) == 0 or len(volumes) == 0 or not dates:
+            raise HTTPException(status_code=400, detail=f"No hourly data loaded for {symbol}")
+
+        STEPS = 5
+        predicted = await asyncio.to_thread(
+            predictor.predict, prices, volumes, steps=STEPS, dates=dates
+        )
+        high, low = predictor.price_bands(predicted)
+
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(
+            _get_plot_pool(), _render_png, dates, prices, predicted, high, low
+        )
+        return base64.b64encode(png).decode("ascii")
@@ -1,23 +1,35 @@
 import json
+import logging
 import os
+import re
 import strawberry
 from typing import List, Optional
-import pandas as pd
-from pandas.tseries.offsets import BDay
+import numpy as np
 from app.services.price_cache import price_cache
 from app.models.predictor import predictor
 from app.services.prediction_service import prediction_service
 from app.models.registry import model_registry
-from app.config.settings import settings
+from app.config.settings import get_settings
+from app.utils.logger import log
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib parser
+    orjson = None
+
+settings = get_settings()
+logger = log
 
 # -----------------------------
 # GraphQL Types
+# Types returned in bulk declare __slots__ to keep per-instance memory small
 # -----------------------------
 @strawberry.type
 class PriceSeries:
     """
     Represents historical price data for a symbol.
     """
+    __slots__ = ("dates", "prices")
     dates: List[str]   # List of dates for historical prices
     prices: List[float]  # Closing prices corresponding to the dates
 
@@ -26,6 +38,7 @@ class PredictedSeries:
     """
     Represents predicted future prices along with high/low bands.
     """
+    __slots__ = ("dates", "prices", "high", "low")
     dates: List[str]   # Future trading dates
     prices: List[float]  # Predicted closing prices
     high: List[float]  # Upper bound prices
@@ -39,8 +52,18 @@ class Prediction:
     actual: PriceSeries
     predicted: PredictedSeries
 
+@strawberry.type
+class SymbolForecast:
+    """
+    Predicted future prices for one symbol in a multi-symbol request.
+    """
+    __slots__ = ("symbol", "predicted")
+    symbol: str
+    predicted: PredictedSeries
+
 @strawberry.type
 class LivePrice:
+    __slots__ = ("symbol", "price", "change_percent", "volume")
     symbol: str
     price: Optional[float]
     change_percent: Optional[float]
@@ -49,6 +72,14 @@ class LivePrice:
 
 @strawberry.type
 class BacktestResult:
+    __slots__ = (
+        "timestamp",
+        "mae_model",
+        "mae_baseline",
+        "directional_accuracy_model",
+        "directional_accuracy_baseline",
+        "validation_size",
+    )
     timestamp: str
     mae_model: float
     mae_baseline: float
@@ -68,33 +99,32 @@ class DriftMetrics:
 
 @strawberry.type
 class FeatureImportance:
+    __slots__ = ("name", "importance")
     name: str
     importance: float
 
 
 @strawberry.type
 class FeatureImportanceSnapshot:
+    __slots__ = ("timestamp", "features")
     timestamp: str
     features: List[FeatureImportance]
 
 
+# orjson parses bytes directly; its JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson else json.loads
+
+# Older log lines use "MAE model=" style keys; rewrite them to "MAE_model=" in one pass
+_NORMALIZE_RE = re.compile(r"(MAE|DirAcc) (model|baseline)=")
+_KV_RE = re.compile(r"(\w+)=(\S+)")
+
+
 def _parse_backtest_line(line: str) -> Optional[BacktestResult]:
     if " | " not in line:
         return None
     timestamp, metrics = line.strip().split(" | ", 1)
-    normalized = (
-        metrics.replace("MAE model=", "MAE_model=")
-        .replace("MAE baseline=", "MAE_baseline=")
-        .replace("DirAcc model=", "DirAcc_model=")
-        .replace("DirAcc baseline=", "DirAcc_baseline=")
-    )
-    parts = normalized.split()
-    values = {}
-    for part in parts:
-        if "=" not in part:
-            continue
-        key, value = part.split("=", 1)
-        values[key.strip()] = value.strip()
+    normalized = _NORMALIZE_RE.sub(r"\1_\2=", metrics)
+    values = dict(_KV_RE.findall(normalized))
 
     try:
         return BacktestResult(
@@ -108,6 +138,85 @@ def _parse_backtest_line(line: str) -> Optional[BacktestResult]:
     except (KeyError, ValueError):
         return None
 
+
+def _tail_lines(path: str, n: int, approx_bytes_per_line: int = 512, raw: bool = False) -> list:
+    """
+    Return the last `n` non-empty lines of a file without reading all of it.
+    The read window grows until it holds `n` lines or reaches the start of the file.
+    With raw=True the lines are returned as undecoded bytes.
+    """
+    if n <= 0:
+        return []
+
+    size = os.path.getsize(path)
+    window = n * approx_bytes_per_line
+    with open(path, "rb") as handle:
+        while True:
+            start = max(0, size - window)
+            handle.seek(start)
+            lines = handle.read().splitlines()
+            if start > 0:
+                lines = lines[1:]  # first line may be partial
+            lines = [line for line in lines if line.strip()]
+            if len(lines) >= n or start == 0:
+                break
+            window *= 2
+
+    if raw:
+        return lines[-n:]
+    return [line.decode("utf-8", errors="replace") for line in lines[-n:]]
+
+
+def _load_backtest_mae_array(path: str, count: int) -> np.ndarray:
+    """
+    Return up to the last `count` model MAE values from the backtest log.
+    Taken from the cached parsed rows, so drift metrics count exactly the
+    lines `backtest_results` accepts.
+    """
+    rows = _load_backtest_rows(path)[-count:] if count > 0 else []
+    return np.fromiter((row.mae_model for row in rows), dtype=np.float64, count=len(rows))
+
+
+_BT_CACHE = {"key": None, "offset": 0, "rows": []}
+
+
+def _load_backtest_rows(path: str) -> List[BacktestResult]:
+    """
+    Return parsed backtest rows, re-reading the log only when it changes.
+    The log is append-only, so growth is handled by parsing just the new bytes.
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if _BT_CACHE["key"] == key:
+        return _BT_CACHE["rows"]
+
+    cached_key = _BT_CACHE["key"]
+    if cached_key and cached_key[0] == path and stat.st_size >= _BT_CACHE["offset"]:
+        offset = _BT_CACHE["offset"]
+        rows = _BT_CACHE["rows"]
+    else:
+        offset = 0
+        rows = []
+
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        chunk = handle.read()
+
+    # Leave a trailing partial line for the next read
+    complete = chunk[: chunk.rfind(b"\n") + 1]
+    for raw in complete.splitlines():
+        line = raw.decode("utf-8", errors="replace")
+        if not line.strip():
+            continue
+        parsed = _parse_backtest_line(line)
+        if parsed:
+            rows.append(parsed)
+
+    _BT_CACHE["key"] = key
+    _BT_CACHE["offset"] = offset + len(complete)
+    _BT_CACHE["rows"] = rows
+    return rows
+
 # -----------------------------
 # GraphQL Query
 # -----------------------------
@@ -121,13 +230,12 @@ class Query:
         """
 
         symbol = symbol.upper()  # Ensure symbol is uppercase (e.g., AAPL)
-        await price_cache.connect()  # Connect to Redis if not already connected
 
         # -----------------------------
         # Load historical daily data
         # -----------------------------
         prices, volumes, dates = await price_cache.get_hourly_history(symbol)
-        if not prices or not volumes:
+        if len(prices) == 0 or len(volumes) == 0:
             raise ValueError("No hourly data loaded for symbol")
 
         # -----------------------------
@@ -149,18 +257,22 @@ class Query:
         predicted = await prediction_service.predict_next_with_dates(symbol, steps=STEPS)
 
         # -----------------------------
-        # DEBUG logging (optional)
+        # DEBUG logging (skipped entirely unless debug is enabled)
         # -----------------------------
-        print(f"Symbol: {symbol}")
-        print("Display dates:", display_dates)
-        print("Predicted future dates:", predicted["dates"])
-        print("Predicted prices:", predicted["prices"])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Symbol=%s display_dates=%s predicted_dates=%s predicted_prices=%s",
+                symbol,
+                display_dates,
+                predicted["dates"],
+                predicted["prices"],
+            )
 
         # -----------------------------
         # Return structured GraphQL response
         # -----------------------------
         return Prediction(
-            actual=PriceSeries(dates=display_dates, prices=display_prices),
+            actual=PriceSeries(dates=display_dates, prices=display_prices.tolist()),
             predicted=PredictedSeries(
                 dates=predicted["dates"],
                 prices=predicted["prices"],
@@ -169,31 +281,44 @@ class Query:
             )
         )
 
+    @strawberry.field
+    async def predict_stocks(self, symbols: Optional[List[str]] = None) -> List[SymbolForecast]:
+        """
+        Predict future prices for several symbols in one batched model pass.
+        If no symbols are provided, use settings.SYMBOLS.
+        """
+        tracked = [symbol.upper() for symbol in (symbols or settings.SYMBOLS)]
+        forecasts = await prediction_service.predict_many_next_with_dates(tracked, steps=6)
+        return [
+            SymbolForecast(
+                symbol=symbol,
+                predicted=PredictedSeries(
+                    dates=forecast["dates"],
+                    prices=forecast["prices"],
+                    high=forecast["high"],
+                    low=forecast["low"],
+                ),
+            )
+            for symbol, forecast in forecasts.items()
+        ]
+
     @strawberry.field
     async def live_prices(self, symbols: Optional[List[str]] = None) -> List[LivePrice]:
         """
         Return latest live prices for provided symbols.
         If no symbols are provided, use settings.SYMBOLS.
         """
-        await price_cache.connect()
-        tracked = symbols or settings.SYMBOLS
-        results: List[LivePrice] = []
-
-        for symbol in tracked:
-            sym = symbol.upper()
-            price = await price_cache.get_live_price(sym)
-            change = await price_cache.get_live_change_percent(sym)
-            volume = await price_cache.get_live_volume(sym)
-            results.append(
-                LivePrice(
-                    symbol=sym,
-                    price=price,
-                    change_percent=change,
-                    volume=volume,
-                )
+        tracked = [symbol.upper() for symbol in (symbols or settings.SYMBOLS)]
+        snapshot = await price_cache.get_live_bulk(tracked)
+        return [
+            LivePrice(
+                symbol=item["symbol"],
+                price=item["price"],
+                change_percent=item["change_percent"],
+                volume=item["volume"],
             )
-
-        return results
+            for item in snapshot
+        ]
 
     @strawberry.field
     async def backtest_results(self, limit: int = 30) -> List[BacktestResult]:
@@ -204,16 +329,7 @@ class Query:
         if not os.path.exists(path):
             return []
 
-        with open(path, "r", encoding="utf-8") as handle:
-            lines = [line for line in handle.readlines() if line.strip()]
-
-        results: List[BacktestResult] = []
-        for line in lines[-limit:]:
-            parsed = _parse_backtest_line(line)
-            if parsed:
-                results.append(parsed)
-
-        return results
+        return list(_load_backtest_rows(path)[-limit:])
 
     @strawberry.field
     async def drift_metrics(self, window: int = 5) -> DriftMetrics:
@@ -224,22 +340,12 @@ class Query:
         if not os.path.exists(path):
             return DriftMetrics(window=window, recent_mae=None, prior_mae=None, delta=None, status="no-data")
 
-        with open(path, "r", encoding="utf-8") as handle:
-            lines = [line for line in handle.readlines() if line.strip()]
-
-        parsed = []
-        for line in lines:
-            result = _parse_backtest_line(line)
-            if result:
-                parsed.append(result)
-
-        if len(parsed) < window * 2:
+        maes = _load_backtest_mae_array(path, window * 2)
+        if len(maes) < window * 2:
             return DriftMetrics(window=window, recent_mae=None, prior_mae=None, delta=None, status="insufficient")
 
-        recent = parsed[-window:]
-        prior = parsed[-(window * 2):-window]
-        recent_mae = sum(r.mae_model for r in recent) / window
-        prior_mae = sum(r.mae_model for r in prior) / window
+        recent_mae = float(maes[-window:].mean())
+        prior_mae = float(maes[:-window].mean())
         delta = recent_mae - prior_mae
 
         if delta > 0.0005:
@@ -271,13 +377,10 @@ class Query:
         if not os.path.exists(path):
             return []
 
-        with open(path, "r", encoding="utf-8") as handle:
-            lines = [line for line in handle.readlines() if line.strip()]
-
         snapshots: List[FeatureImportanceSnapshot] = []
-        for line in lines[-limit:]:
+        for line in _tail_lines(path, limit, approx_bytes_per_line=1024, raw=True):
             try:
-                payload = json.loads(line)
+                payload = _json_loads(line)
                 features = [
                     FeatureImportance(**item) for item in payload.get("features", [])
                 ]
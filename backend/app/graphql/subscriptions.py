@@ -2,13 +2,10 @@
 
 # import strawberry
 # from typing import AsyncGenerator
-# from ..services.price_cache import PriceCache
+# from ..services.price_cache import price_cache
 # from ..services.prediction_service import prediction_service
 
 
-# price_cache = PriceCache()
-
-
 # @strawberry.type
 # class PriceStream:
 #     symbol: str
@@ -2,16 +2,19 @@ import asyncio
 import json
 import os
 import time
-from collections import defaultdict, deque
+import orjson
+from collections import OrderedDict
+import ormsgpack
 from datetime import datetime, timezone
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from strawberry.fastapi import GraphQLRouter
 
-from .tasks.runner import start_background_tasks
-from .models.predictor import get_predictor
+from .tasks.runner import is_leader, start_background_tasks
+from .models import features
 from .graphql.schema import schema
+from .graphql.mutations import shutdown_plot_pool
 from .models.registry import model_registry
 from .services.price_cache import price_cache
 from .services.prediction_service import prediction_service
@@ -20,6 +23,13 @@ from .config.settings import settings
 from .utils.logger import log
 
 _START_TIME = time.time()
+_LOG_TAIL_BYTES = 4096
+_file_cache: dict = {}
+
+
+def _dumps(payload) -> bytes:
+    """Encode a payload with orjson, passing numpy scalars/arrays straight through."""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
 
 # -----------------------------
 # Initialize FastAPI app
@@ -42,6 +52,19 @@ app.add_middleware(
     allow_headers=["*"],  # allow all headers
 )
 
+_background_task: asyncio.Task | None = None
+_model_load_task: asyncio.Task | None = None
+_sweep_task: asyncio.Task | None = None
+
+
+def _log_model_load_result(task: asyncio.Task):
+    """Surface startup load/train failures; the training loop retries the load."""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        log.error(f"Initial model load failed: {exc}")
+
 # -----------------------------
 # Startup Event: runs when the server starts
 # -----------------------------
@@ -54,16 +77,43 @@ async def on_startup():
        - Periodic model training
     2. Loads/trains the global XGBoost model via model_registry
     """
+    # Open the shared Redis pool once so later connect() calls are no-ops
+    try:
+        await price_cache.connect()
+    except Exception as e:
+        log.error(f"Redis unavailable at startup, will retry on first use: {e}")
+
+    global _sweep_task
+    _sweep_task = asyncio.create_task(_sweep_rate_buckets())
+
+    # Compile (or load cached) feature kernels before the first prediction
+    await asyncio.to_thread(features.warmup)
+
     # Start background tasks in an asyncio task (non-blocking)
-    asyncio.create_task(start_background_tasks())
+    global _background_task
+    _background_task = asyncio.create_task(start_background_tasks())
     print("🚀 Background tasks started")
 
-    # NOTE: Duplicate call—should remove one to avoid running tasks twice
-    asyncio.create_task(start_background_tasks())
+    # Load the global model in the background. Only the background leader trains
+    # when no artifacts exist; other workers wait for its save and reload it.
+    # Until it is ready, predictions return empty with a "model not ready" warning.
+    global _model_load_task
+    _model_load_task = asyncio.create_task(model_registry.load(train=is_leader()))
+    _model_load_task.add_done_callback(_log_model_load_result)
 
-    # Load the global model into memory (train if not already trained)
-    await model_registry.load()
-    print("✅ Global XGBoost model trained")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Cancel the background loops, sweeps and any pending model load; loops close their pooled HTTP clients."""
+    for task in (_background_task, _model_load_task, _sweep_task, _live_state["task"]):
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+    # Render workers are separate processes; stop them rather than leave them orphaned
+    await asyncio.to_thread(shutdown_plot_pool)
 
 # -----------------------------
 # Mount GraphQL API at /graphql
@@ -72,7 +122,26 @@ async def on_startup():
 graphql_app = GraphQLRouter(schema)
 app.include_router(graphql_app, prefix="/graphql")
 
-_rate_buckets = defaultdict(deque)
+# -----------------------------
+# Per-IP token buckets: (tokens, last_refill) -> O(1) work per request.
+# LRU-ordered and capped; idle buckets are swept periodically.
+# -----------------------------
+_RATE_BUCKETS_MAX = 100_000
+_RATE_SWEEP_SECONDS = 60
+_rate_buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+
+async def _sweep_rate_buckets():
+    """Drop buckets untouched for ten windows; a full bucket is equivalent to none."""
+    while True:
+        await asyncio.sleep(_RATE_SWEEP_SECONDS)
+        cutoff = time.time() - settings.RATE_LIMIT_WINDOW_SECONDS * 10
+        # Oldest-touched first: stop at the first recent bucket
+        while _rate_buckets:
+            ip, (_, last) = next(iter(_rate_buckets.items()))
+            if last >= cutoff:
+                break
+            del _rate_buckets[ip]
 
 
 @app.middleware("http")
@@ -83,25 +152,96 @@ async def rate_limit_and_log(request: Request, call_next):
 
     ip = request.client.host if request.client else "unknown"
     now = time.time()
-    bucket = _rate_buckets[ip]
+    capacity = settings.RATE_LIMIT_MAX
     window = settings.RATE_LIMIT_WINDOW_SECONDS
-    while bucket and now - bucket[0] > window:
-        bucket.popleft()
-    if len(bucket) >= settings.RATE_LIMIT_MAX:
+    bucket = _rate_buckets.get(ip)
+    if bucket is None:
+        if len(_rate_buckets) >= _RATE_BUCKETS_MAX:
+            _rate_buckets.popitem(last=False)
+        tokens, last = capacity, now
+    else:
+        tokens, last = bucket
+        _rate_buckets.move_to_end(ip)
+    tokens = min(capacity, tokens + (now - last) * capacity / window)
+    if tokens < 1:
+        _rate_buckets[ip] = (tokens, now)
         return JSONResponse({"detail": "Rate limit exceeded"}, status_code=429)
-    bucket.append(now)
+    _rate_buckets[ip] = (tokens - 1, now)
 
     start = time.perf_counter()
     response = await call_next(request)
     duration_ms = int((time.perf_counter() - start) * 1000)
+    # Queued for the logger's listener thread; no console I/O on the loop
     log.info(f"{ip} {request.method} {path} {response.status_code} {duration_ms}ms")
     return response
 
 
+def _cached_by_mtime(path: str, loader):
+    """
+    Return loader(path), re-running it only when the file's mtime or size changes.
+    Returns None if the file is missing or cannot be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    try:
+        value = loader(path)
+    except Exception:
+        value = None
+    _file_cache[path] = (key, value)
+    return value
+
+
+def _read_model_trained_at(path: str):
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle).get("trained_at")
+
+
+def _read_last_log_timestamp(path: str):
+    """Timestamp of the last non-empty log line, reading only the end of the file."""
+    with open(path, "rb") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        start = max(0, size - _LOG_TAIL_BYTES)
+        handle.seek(start)
+        lines = handle.read().splitlines()
+        if start > 0:
+            lines = lines[1:]  # first line may be partial
+        lines = [line for line in lines if line.strip()]
+        if not lines and start > 0:
+            handle.seek(0)
+            lines = [line for line in handle.read().splitlines() if line.strip()]
+    if not lines:
+        return None
+    return lines[-1].decode("utf-8", errors="replace").split(" | ", 1)[0].strip()
+
+
+def _age_seconds(epoch: float | None, now: float):
+    """Whole seconds since an epoch timestamp, or None if missing."""
+    if epoch is None:
+        return None
+    return int(now - epoch)
+
+
+# -----------------------------
+# /health is polled by load balancers: serve the encoded body for a short TTL
+# -----------------------------
+_HEALTH_TTL_SECONDS = 2.0
+_health_cache: bytes | None = None
+_health_expiry = 0.0
+
+
 @app.get("/health")
 async def health():
     """System health summary for UI and monitoring."""
-    await price_cache.connect()
+    global _health_cache, _health_expiry
+    if _health_cache is not None and time.monotonic() < _health_expiry:
+        return Response(content=_health_cache, media_type="application/json")
+
     redis_ok = False
     try:
         pong = await price_cache.redis.ping()
@@ -110,47 +250,23 @@ async def health():
         redis_ok = False
 
     now = datetime.now(timezone.utc)
-    symbols = []
-    for symbol in settings.SYMBOLS:
-        price = await price_cache.get_live_price(symbol)
-        ts = await price_cache.get_live_timestamp(symbol)
-        age_seconds = None
-        if ts:
-            try:
-                dt = datetime.fromisoformat(ts)
-                age_seconds = int((now - dt).total_seconds())
-            except ValueError:
-                age_seconds = None
-        symbols.append(
-            {
-                "symbol": symbol,
-                "price": price,
-                "last_update": ts,
-                "age_seconds": age_seconds,
-            }
-        )
+    now_ts = now.timestamp()
+    live = await price_cache.get_live_bulk(settings.SYMBOLS)
+    symbols = [
+        {
+            "symbol": item["symbol"],
+            "price": item["price"],
+            "last_update": item["last_update"],
+            "age_seconds": _age_seconds(item["last_update_epoch"], now_ts),
+        }
+        for item in live
+    ]
 
     model_meta_path = os.path.join(settings.MODEL_DIR, settings.MODEL_META_FILE)
-    model_trained_at = None
-    if os.path.exists(model_meta_path):
-        try:
-            with open(model_meta_path, "r", encoding="utf-8") as handle:
-                meta = json.load(handle)
-                model_trained_at = meta.get("trained_at")
-        except Exception:
-            model_trained_at = None
-
-    backtest_last_run = None
-    if os.path.exists(settings.BACKTEST_LOG_PATH):
-        try:
-            with open(settings.BACKTEST_LOG_PATH, "r", encoding="utf-8") as handle:
-                for line in handle:
-                    if line.strip():
-                        backtest_last_run = line.split(" | ", 1)[0].strip()
-        except Exception:
-            backtest_last_run = None
+    model_trained_at = _cached_by_mtime(model_meta_path, _read_model_trained_at)
+    backtest_last_run = _cached_by_mtime(settings.BACKTEST_LOG_PATH, _read_last_log_timestamp)
 
-    return {
+    payload = {
         "ok": True,
         "server_time": now.isoformat(),
         "redis": {"ok": redis_ok},
@@ -158,39 +274,27 @@ async def health():
         "model": {"trained_at": model_trained_at},
         "backtest": {"last_run": backtest_last_run},
     }
+    _health_cache = _dumps(payload)
+    _health_expiry = time.monotonic() + _HEALTH_TTL_SECONDS
+    return Response(content=_health_cache, media_type="application/json")
 
 
 @app.get("/status")
 async def status():
     now = datetime.now(timezone.utc)
+    now_ts = now.timestamp()
     uptime_seconds = int(time.time() - _START_TIME)
-    symbols = []
-    for symbol in settings.SYMBOLS:
-        ts = await price_cache.get_live_timestamp(symbol)
-        age_seconds = None
-        if ts:
-            try:
-                dt = datetime.fromisoformat(ts)
-                age_seconds = int((now - dt).total_seconds())
-            except ValueError:
-                age_seconds = None
-        symbols.append(
-            {
-                "symbol": symbol,
-                "last_update": ts,
-                "age_seconds": age_seconds,
-            }
-        )
-
-    backtest_last_run = None
-    if os.path.exists(settings.BACKTEST_LOG_PATH):
-        try:
-            with open(settings.BACKTEST_LOG_PATH, "r", encoding="utf-8") as handle:
-                for line in handle:
-                    if line.strip():
-                        backtest_last_run = line.split(" | ", 1)[0].strip()
-        except Exception:
-            backtest_last_run = None
+    live = await price_cache.get_live_bulk(settings.SYMBOLS)
+    symbols = [
+        {
+            "symbol": item["symbol"],
+            "last_update": item["last_update"],
+            "age_seconds": _age_seconds(item["last_update_epoch"], now_ts),
+        }
+        for item in live
+    ]
+
+    backtest_last_run = _cached_by_mtime(settings.BACKTEST_LOG_PATH, _read_last_log_timestamp)
 
     return {
         "uptime_seconds": uptime_seconds,
@@ -200,57 +304,110 @@ async def status():
     }
 
 
+# -----------------------------
+# Shared live snapshot: one producer reads Redis and serializes each tick,
+# every /ws/live client sends the same pre-encoded payload.
+# JSON text by default; ?format=msgpack clients get binary msgpack frames.
+# -----------------------------
+_LIVE_TICK_SECONDS = 5
+_live_state = {"payload": None, "payload_msgpack": None, "event": asyncio.Event(), "task": None}
+
+
+async def _live_snapshot_loop():
+    while True:
+        try:
+            snapshot = await price_cache.get_live_bulk(settings.SYMBOLS)
+            message = {"type": "live_prices", "data": snapshot}
+            _live_state["payload"] = _dumps(message).decode()
+            _live_state["payload_msgpack"] = ormsgpack.packb(
+                message, option=ormsgpack.OPT_SERIALIZE_NUMPY
+            )
+            # Wake current waiters and hand later ones a fresh event
+            tick, _live_state["event"] = _live_state["event"], asyncio.Event()
+            tick.set()
+        except Exception as e:
+            log.error(f"Live snapshot refresh failed: {e}")
+        await asyncio.sleep(_LIVE_TICK_SECONDS)
+
+
+def _ensure_live_producer():
+    task = _live_state["task"]
+    if task is None or task.done():
+        _live_state["task"] = asyncio.create_task(_live_snapshot_loop())
+
+
 @app.websocket("/ws/live")
 async def live_prices_socket(websocket: WebSocket):
     await websocket.accept()
+    _ensure_live_producer()
+    binary = websocket.query_params.get("format") == "msgpack"
     try:
         while True:
-            snapshot = []
-            for symbol in settings.SYMBOLS:
-                price = await price_cache.get_live_price(symbol)
-                change = await price_cache.get_live_change_percent(symbol)
-                volume = await price_cache.get_live_volume(symbol)
-                ts = await price_cache.get_live_timestamp(symbol)
-                snapshot.append(
-                    {
-                        "symbol": symbol,
-                        "price": price,
-                        "change_percent": change,
-                        "volume": volume,
-                        "last_update": ts,
-                    }
-                )
-            await websocket.send_text(json.dumps({"type": "live_prices", "data": snapshot}))
-            await asyncio.sleep(5)
+            tick = _live_state["event"]
+            if binary:
+                if _live_state["payload_msgpack"] is not None:
+                    await websocket.send_bytes(_live_state["payload_msgpack"])
+            elif _live_state["payload"] is not None:
+                await websocket.send_text(_live_state["payload"])
+            await tick.wait()
     except WebSocketDisconnect:
         return
     except Exception:
         await websocket.close()
 
 
+# -----------------------------
+# Per-interval prediction memo: one inference per symbol per PREDICT_INTERVAL,
+# shared (already serialized) by every /ws/predict client on that symbol.
+# LRU-ordered and capped, since clients choose the symbol.
+# -----------------------------
+_PRED_CACHE_MAX = 1024
+_pred_cache: OrderedDict[str, tuple[int, asyncio.Future]] = OrderedDict()
+
+
+async def _build_prediction_payload(sym: str) -> str:
+    prices, volumes, dates = await price_cache.get_hourly_history(sym)
+    if len(prices) == 0 or len(volumes) == 0:
+        return _dumps({"error": "No hourly data loaded"}).decode()
+
+    display_window = max(24, predictor.look_back)
+    display_prices = prices[-display_window:]
+    display_dates = dates[-display_window:]
+
+    predicted = await prediction_service.predict_next_with_dates(sym, steps=6)
+
+    payload = {
+        "actual": {"dates": display_dates, "prices": display_prices},
+        "predicted": predicted,
+    }
+    return _dumps(payload).decode()
+
+
+async def _prediction_payload(sym: str) -> str:
+    bucket = int(time.time() // settings.PREDICT_INTERVAL)
+    cached = _pred_cache.get(sym)
+    if cached and cached[0] == bucket:
+        task = cached[1]
+        if not (task.done() and task.exception() is not None):
+            _pred_cache.move_to_end(sym)
+            return await asyncio.shield(task)
+
+    task = asyncio.ensure_future(_build_prediction_payload(sym))
+    _pred_cache[sym] = (bucket, task)
+    _pred_cache.move_to_end(sym)
+    if len(_pred_cache) > _PRED_CACHE_MAX:
+        _pred_cache.popitem(last=False)
+    # Shield so one client disconnecting doesn't cancel the shared inference
+    return await asyncio.shield(task)
+
+
 @app.websocket("/ws/predict/{symbol}")
 async def prediction_socket(websocket: WebSocket, symbol: str):
     await websocket.accept()
     sym = symbol.upper()
     try:
         while True:
-            prices, volumes, dates = await price_cache.get_hourly_history(sym)
-            if not prices or not volumes:
-                await websocket.send_text(json.dumps({"error": "No hourly data loaded"}))
-                await asyncio.sleep(settings.PREDICT_INTERVAL)
-                continue
-
-            display_window = max(24, predictor.look_back)
-            display_prices = prices[-display_window:]
-            display_dates = dates[-display_window:]
-
-            predicted = await prediction_service.predict_next_with_dates(sym, steps=6)
-
-            payload = {
-                "actual": {"dates": display_dates, "prices": display_prices},
-                "predicted": predicted,
-            }
-            await websocket.send_text(json.dumps(payload))
+            await websocket.send_text(await _prediction_payload(sym))
             await asyncio.sleep(settings.PREDICT_INTERVAL)
     except WebSocketDisconnect:
         return
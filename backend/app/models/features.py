@@ -0,0 +1,180 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # same kernels, interpreted: slower, identical results
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+# -----------------------------
+# Compiled per-symbol feature kernels.
+# Match the pandas definitions they replace:
+#   rolling(w).mean().bfill(), rolling(w).std().fillna(k),
+#   ewm(span, adjust=False).mean(), and the rolling-mean RSI.
+# -----------------------------
+NUM_PRICE_FEATURES = 9  # price, volume, log_return, rolling mean/std, rsi, macd, macd_signal, volume_z
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean_std(x, window, std_fill):
+    """
+    Rolling mean and sample std in one pass: running sum and sum of squares
+    with add-new/subtract-old updates. Values are taken relative to x[0] to
+    keep the sum of squares well conditioned.
+    """
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, std_fill)
+    if n == 0:
+        return mean, std
+    shift = x[0]
+    s1 = 0.0
+    s2 = 0.0
+    run = 0  # length of the current run of equal values
+    for i in range(n):
+        d = x[i] - shift
+        s1 += d
+        s2 += d * d
+        if i >= window:
+            d = x[i - window] - shift
+            s1 -= d
+            s2 -= d * d
+        run = run + 1 if i > 0 and x[i] == x[i - 1] else 1
+        if i >= window - 1:
+            if run >= window:
+                # Flat window: exact, without the running sums' rounding residue
+                mean[i] = x[i]
+                std[i] = 0.0
+            else:
+                m = s1 / window
+                mean[i] = shift + m
+                std[i] = np.sqrt(max((s2 - s1 * m) / (window - 1), 0.0))
+    # Back-fill the warm-up period with the first full window
+    if n >= window:
+        for i in range(window - 1):
+            mean[i] = mean[window - 1]
+    return mean, std
+
+
+@njit(cache=True, nogil=True, fastmath=True)
+def ema(x, span):
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty(x.shape[0])
+    if x.shape[0] == 0:
+        return out
+    out[0] = x[0]
+    for i in range(1, x.shape[0]):
+        out[i] = out[i - 1] + alpha * (x[i] - out[i - 1])
+    return out
+
+
+@njit(cache=True, nogil=True, fastmath=True)
+def rsi(prices, period):
+    """
+    Rolling-mean RSI as one running-sum scan over price deltas.
+    Index 0 contributes a zero delta, matching diff().fillna(0).
+    """
+    n = prices.shape[0]
+    out = np.empty(n)
+    gain = 0.0
+    loss = 0.0
+    # Non-zero terms in each sum; when a count drops to zero its sum is reset
+    # exactly, so flat windows still read as "no movement" despite rounding.
+    ups = 0
+    downs = 0
+    for i in range(n):
+        if i >= 1:
+            d = prices[i] - prices[i - 1]
+            if d > 0:
+                gain += d
+                ups += 1
+            elif d < 0:
+                loss -= d
+                downs += 1
+        j = i - period  # delta leaving the window
+        if j >= 1:
+            d = prices[j] - prices[j - 1]
+            if d > 0:
+                gain -= d
+                ups -= 1
+            elif d < 0:
+                loss += d
+                downs -= 1
+        if ups == 0:
+            gain = 0.0
+        if downs == 0:
+            loss = 0.0
+
+        if gain == 0.0 and loss == 0.0:
+            out[i] = 50.0
+        elif loss == 0.0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + gain / loss)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def fill_features(prices, volumes, out):
+    """
+    Write the price/volume feature columns for one symbol into `out`, an
+    (n, NUM_PRICE_FEATURES) array or column slice of a wider feature buffer.
+    Time and market columns are filled by the caller.
+    """
+    n = prices.shape[0]
+    out[:, 0] = prices
+    out[:, 1] = volumes
+
+    out[0, 2] = 0.0
+    for i in range(1, n):
+        out[i, 2] = np.log(prices[i] / prices[i - 1])
+
+    rolling_mean, rolling_std = rolling_mean_std(prices, 5, 0.0)
+    out[:, 3] = rolling_mean
+    out[:, 4] = rolling_std
+    out[:, 5] = rsi(prices, 14)
+
+    macd = ema(prices, 12) - ema(prices, 26)
+    out[:, 6] = macd
+    out[:, 7] = ema(macd, 9)
+
+    vol_mean, vol_std = rolling_mean_std(volumes, 20, 1.0)
+    out[:, 8] = (volumes - vol_mean) / vol_std
+
+
+@njit(cache=True, nogil=True)
+def build_features(prices, volumes):
+    """Price/volume feature columns for one symbol, shape (n, NUM_PRICE_FEATURES)."""
+    out = np.empty((prices.shape[0], 9))
+    fill_features(prices, volumes, out)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def fill_windows(prices, volumes, hours, weekdays, market, start, look_back, out):
+    """
+    Feature windows [start, start + look_back) for every row of the 2-D
+    price/volume/time buffers, written into `out` (rows, look_back, F).
+    Columns are the price features, hour, weekday, then the shared market
+    columns, matching the training layout.
+    """
+    stop = start + look_back
+    for r in range(prices.shape[0]):
+        window = out[r]
+        fill_features(prices[r, start:stop], volumes[r, start:stop], window[:, :9])
+        window[:, 9] = hours[r, start:stop]
+        window[:, 10] = weekdays[r, start:stop]
+        window[:, 11:] = market
+
+
+def warmup():
+    """Compile (or load cached) kernels so the first prediction doesn't pay for JIT."""
+    x = np.linspace(1.0, 2.0, 32)
+    build_features(x, x)
+    for dtype in (np.float32, np.float64):
+        fill_features(x, x, np.empty((32, 12), dtype=dtype)[:, :9])
+    rows = np.tile(x, (2, 1))
+    for dtype in (np.float32, np.float64):
+        fill_windows(rows, rows, rows, rows, np.zeros((16, 1)), 0, 16, np.empty((2, 16, 12), dtype=dtype))
@@ -1,18 +1,84 @@
 import asyncio
 import json
 import os
+import time
+from functools import lru_cache
 import numpy as np
 import pandas as pd
+import xgboost
 from xgboost import XGBRegressor
 from sklearn.preprocessing import StandardScaler
 import joblib
 import yfinance as yf
 from ..services.price_cache import price_cache
 from ..config.settings import settings
+from .features import NUM_PRICE_FEATURES, ema, fill_features, fill_windows, rsi
+
+try:
+    import onnxruntime as ort
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+except ImportError:  # predictions fall back to the XGBoost booster
+    ort = None
+
+def _xgb_device():
+    """'cuda' when USE_GPU is set and this xgboost build has CUDA support."""
+    if settings.USE_GPU:
+        try:
+            if xgboost.build_info().get("USE_CUDA"):
+                return "cuda"
+        except Exception:
+            pass
+        print("⚠️ USE_GPU set but xgboost has no CUDA support; training on CPU")
+    return "cpu"
+
+
+def _onnx_session(model):
+    """onnxruntime session for a fitted XGBRegressor, or None to predict with the booster."""
+    if ort is None or not settings.USE_ONNX:
+        return None
+    try:
+        onnx_model = convert_xgboost(
+            model, initial_types=[("input", FloatTensorType([None, model.n_features_in_]))]
+        )
+        return ort.InferenceSession(
+            onnx_model.SerializeToString(), providers=["CPUExecutionProvider"]
+        )
+    except Exception as exc:
+        print(f"⚠️ ONNX export failed, predicting with the booster: {exc}")
+        return None
+
+
+def _scaling_params(scaler):
+    """
+    float32 mean and reciprocal scale of a fitted StandardScaler. Training
+    and serving both standardize as (x - mean) * inv_scale in float32, so a
+    window scales to the same values in both.
+    """
+    return scaler.mean_.astype(np.float32), (1.0 / scaler.scale_).astype(np.float32)
+
 
 # -----------------------------
 # XGBoostPredictor: global AI model for all symbols
 # -----------------------------
+
+def _to_datetime64(dates):
+    """Date strings as datetime64[m]; entries numpy can't parse are coerced to NaT."""
+    try:
+        return np.asarray(dates, dtype="datetime64[m]")
+    except ValueError:
+        return pd.to_datetime(pd.Series(list(dates)), errors="coerce").to_numpy(dtype="datetime64[m]")
+
+
+def _hour_weekday(stamps):
+    """Hour of day and day of week (Mon=0) of datetime64 stamps, 0 for NaT."""
+    hours = stamps.astype("datetime64[h]").astype(np.int64) % 24
+    weekdays = (stamps.astype("datetime64[D]").astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    nat = np.isnat(stamps)
+    hours[nat] = 0
+    weekdays[nat] = 0
+    return hours, weekdays
+
 class XGBoostPredictor:
     """
     Global XGBoost predictor trained across all symbols.
@@ -36,20 +102,43 @@ class XGBoostPredictor:
         self.history_period = settings.HOURLY_HISTORY_PERIOD
 
         # XGBoost regression model
-        self.model = XGBRegressor(
+        model = XGBRegressor(
             n_estimators=300,
             max_depth=4,
             learning_rate=0.05,
             subsample=0.8,
             colsample_bytree=0.8,
             objective="reg:squarederror",
+            tree_method="hist",
+            max_bin=256,
+            device=_xgb_device(),
         )
 
-        # StandardScaler for normalizing input features
-        self.scaler = StandardScaler()
+        # Everything inference needs, replaced with one assignment so a
+        # prediction running in another thread never pairs one fit's scaler
+        # with another's trees: (model, scaler, onnx session or None,
+        # float32 mean, float32 1/scale)
+        self._serving = (model, StandardScaler(), None, None, None)
         self.trained = False
         self.market_returns = None
-        self.feature_version = "v2"
+        # Bump when the feature layout or definitions change; older artifacts are retrained
+        self.feature_version = "v4"
+        self._cached_importances = None
+
+    @property
+    def model(self):
+        return self._serving[0]
+
+    @property
+    def scaler(self):
+        """StandardScaler for normalizing input features."""
+        return self._serving[1]
+
+    def _swap_serving(self, model, scaler, session):
+        """Publish a fitted model, its scaler and ONNX session together."""
+        self._serving = (model, scaler, session, *_scaling_params(scaler))
+        self.trained = True
+        self._cached_importances = None
 
     def _artifact_paths(self):
         model_dir = settings.MODEL_DIR
@@ -64,8 +153,9 @@ class XGBoostPredictor:
         paths = self._artifact_paths()
         try:
             os.makedirs(paths["dir"], exist_ok=True)
-            self.model.get_booster().save_model(paths["model"])
-            joblib.dump(self.scaler, paths["scaler"])
+            model, scaler = self._serving[:2]  # one fit's pair, even mid-swap
+            model.get_booster().save_model(paths["model"])
+            joblib.dump(scaler, paths["scaler"])
             meta = {
                 "trained_at": pd.Timestamp.utcnow().isoformat(),
                 "look_back": self.look_back,
@@ -79,14 +169,35 @@ class XGBoostPredictor:
         except Exception as exc:
             print(f"⚠️ Failed to save model artifacts: {exc}")
 
+    def _artifacts_compatible(self, meta):
+        """Saved artifacts are only reusable if they were built with the same feature layout."""
+        return (
+            meta.get("feature_version") == self.feature_version
+            and meta.get("look_back") == self.look_back
+            and meta.get("interval") == self.interval
+            and meta.get("market_indices") == self.market_indices
+        )
+
     def load_artifacts(self):
+        """
+        Restore the saved model and scaler instead of retraining.
+        Returns False when artifacts are missing, unreadable, or were saved with
+        a different feature layout, so the caller trains from scratch.
+        """
         paths = self._artifact_paths()
-        if not (os.path.exists(paths["model"]) and os.path.exists(paths["scaler"])):
+        if not all(os.path.exists(paths[key]) for key in ("model", "scaler", "meta")):
             return False
         try:
-            self.model.get_booster().load_model(paths["model"])
-            self.scaler = joblib.load(paths["scaler"])
-            self.trained = True
+            with open(paths["meta"], "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            if not self._artifacts_compatible(meta):
+                print("⚠️ Saved model was built with a different feature layout; retraining")
+                return False
+
+            model = XGBRegressor(**self.model.get_params())
+            model.load_model(paths["model"])
+            scaler = joblib.load(paths["scaler"])
+            self._swap_serving(model, scaler, _onnx_session(model))
             try:
                 self.market_returns = self._get_market_returns()
             except Exception as exc:
@@ -100,7 +211,40 @@ class XGBoostPredictor:
     # -----------------------------
     # Load hourly market returns (e.g., SPY, QQQ, ^VIX)
     # -----------------------------
+    def _market_returns_cache_path(self):
+        return os.path.join(
+            settings.MODEL_DIR,
+            f"market_returns_{self.interval}_{self.history_period}.npz",
+        )
+
     def _get_market_returns(self):
+        """
+        Hourly log returns per market index, served from an on-disk npz cache
+        while it is younger than MARKET_RETURNS_CACHE_SECONDS.
+        Returns:
+            dict[str, np.ndarray]: Map of symbol -> log return series
+        """
+        path = self._market_returns_cache_path()
+        try:
+            if time.time() - os.path.getmtime(path) < settings.MARKET_RETURNS_CACHE_SECONDS:
+                with np.load(path) as cached:
+                    if all(symbol in cached for symbol in self.market_indices):
+                        return {symbol: cached[symbol] for symbol in self.market_indices}
+        except (OSError, ValueError):
+            pass
+
+        returns = self._download_market_returns()
+        try:
+            os.makedirs(settings.MODEL_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as handle:
+                np.savez(handle, **returns)
+            os.replace(tmp, path)
+        except OSError as exc:
+            print(f"⚠️ Failed to cache market returns: {exc}")
+        return returns
+
+    def _download_market_returns(self):
         """
         Downloads market index data and computes hourly log returns.
         Returns:
@@ -119,32 +263,34 @@ class XGBoostPredictor:
             if data.empty:
                 raise ValueError(f"No market data returned for {symbol}")
 
-            prices = data["Close"].ffill().to_numpy()
+            prices = data["Close"].ffill().to_numpy(dtype=float).ravel()
             if len(prices) < 2:
                 raise ValueError(f"Not enough data to compute returns for {symbol}")
 
-            returns[symbol] = np.diff(np.log(prices), prepend=np.log(prices[0]))
+            # log(p[t] / p[t-1]): one log per bar, first bar has no return
+            ret = np.empty(len(prices))
+            ret[0] = 0.0
+            np.divide(prices[1:], prices[:-1], out=ret[1:])
+            np.log(ret[1:], out=ret[1:])
+            returns[symbol] = ret
 
         return returns
 
     def _calc_rsi(self, prices, period=14):
-        series = pd.Series(prices)
-        delta = series.diff().fillna(0)
-        gain = delta.clip(lower=0).rolling(period, min_periods=1).mean()
-        loss = (-delta.clip(upper=0)).rolling(period, min_periods=1).mean()
-        rs = gain / loss.replace(0, np.nan)
-        rsi = 100 - (100 / (1 + rs))
-        no_movement = (gain == 0) & (loss == 0)
-        rsi = rsi.mask(no_movement, 50)
-        rsi = rsi.fillna(100)
-        return rsi.values
+        return rsi(np.asarray(prices, dtype=np.float64), period)
 
     def _calc_ema(self, prices, span):
-        return pd.Series(prices).ewm(span=span, adjust=False).mean().values
+        return ema(np.asarray(prices, dtype=np.float64), span)
 
     def get_feature_importances(self, top_k=10):
         if not self.trained:
             return []
+        # Constant for a fitted model; ranked once, reset when the model changes
+        if self._cached_importances is None:
+            self._cached_importances = self._rank_feature_importances()
+        return self._cached_importances[:top_k]
+
+    def _rank_feature_importances(self):
         num_market = len(self.market_indices)
         base_features = [
             "price",
@@ -170,14 +316,9 @@ class XGBoostPredictor:
         if len(importances) != total_expected:
             return []
 
-        reshaped = importances.reshape(self.look_back, num_features)
-        aggregated = reshaped.mean(axis=0)
-        ranked = sorted(
-            zip(feature_names, aggregated),
-            key=lambda item: item[1],
-            reverse=True,
-        )
-        return [{"name": name, "importance": float(score)} for name, score in ranked[:top_k]]
+        aggregated = importances.reshape(self.look_back, num_features).mean(axis=0)
+        order = np.argsort(-aggregated, kind="stable")
+        return [{"name": feature_names[i], "importance": float(aggregated[i])} for i in order]
 
     # -----------------------------
     # Feature engineering for a single symbol
@@ -192,90 +333,125 @@ class XGBoostPredictor:
             - Market index returns
             - Time features (hour, day of week)
         """
-        prices = np.array(prices, dtype=float)
-        volumes = np.array(volumes, dtype=float)
-        log_returns = np.diff(np.log(prices), prepend=np.log(prices[0]))
-
-        rolling_mean = pd.Series(prices).rolling(5).mean().bfill().values
-        rolling_std = pd.Series(prices).rolling(5).std().fillna(0).values
-        rsi = self._calc_rsi(prices)
-        ema_fast = self._calc_ema(prices, span=12)
-        ema_slow = self._calc_ema(prices, span=26)
-        macd = ema_fast - ema_slow
-        macd_signal = pd.Series(macd).ewm(span=9, adjust=False).mean().values
-
-        vol_mean = pd.Series(volumes).rolling(20).mean().bfill().values
-        vol_std = pd.Series(volumes).rolling(20).std().fillna(1).values
-        vol_z = (volumes - vol_mean) / vol_std
-
-        dt_index = pd.to_datetime(pd.Series(dates), errors="coerce")
-        hours = dt_index.dt.hour.fillna(0).values / 23.0
-        weekdays = dt_index.dt.dayofweek.fillna(0).values / 6.0
-
-        features = np.column_stack([
-            prices,
-            volumes,
-            log_returns,
-            rolling_mean,
-            rolling_std,
-            rsi,
-            macd,
-            macd_signal,
-            vol_z,
-            hours,
-            weekdays,
-            market_features,
-        ])
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        volumes = np.ascontiguousarray(volumes, dtype=np.float64)
+        market_features = np.asarray(market_features)
+
+        # One preallocated float32 buffer; every feature is written into its column(s)
+        features = np.empty(
+            (len(prices), NUM_PRICE_FEATURES + 2 + market_features.shape[1]),
+            dtype=np.float32,
+        )
+        # Price, volume, log return, rolling mean/std, RSI, MACD, signal, volume z-score
+        fill_features(prices, volumes, features[:, :NUM_PRICE_FEATURES])
+
+        hours, weekdays = _hour_weekday(_to_datetime64(dates))
+        np.divide(hours, 23.0, out=features[:, NUM_PRICE_FEATURES], casting="same_kind")
+        np.divide(weekdays, 6.0, out=features[:, NUM_PRICE_FEATURES + 1], casting="same_kind")
+        features[:, NUM_PRICE_FEATURES + 2:] = market_features
         return features
 
     # -----------------------------
     # Build global dataset from all symbols
     # -----------------------------
-    async def _build_global_dataset(self):
+    async def _build_global_dataset(self, scaler=None):
         """
         Creates feature and target arrays (X, y) for training.
+        Fits `scaler` (default: a new StandardScaler) on the features;
+        the serving scaler is never refitted in place.
         Returns:
             X_scaled (np.ndarray), y (np.ndarray)
         """
-        X_all, y_all = [], []
-
-        try:
-            self.market_returns = self._get_market_returns()
-        except Exception as e:
-            print(f"⚠️ Failed to load market returns: {e}")
-            self.market_returns = {symbol: np.zeros(1) for symbol in self.market_indices}
-
-        for symbol in self.symbols:
-            prices, volumes, dates = await price_cache.get_hourly_history(symbol)
-            if len(prices) < self.look_back + 30:
-                continue
-
-            prices = np.array(prices)
-            volumes = np.array(volumes)
-            market_columns = []
-            for market_symbol in self.market_indices:
-                market_slice = self.market_returns.get(market_symbol, np.zeros(1))[-len(prices):]
-                if len(market_slice) < len(prices):
-                    market_slice = np.pad(market_slice, (len(prices)-len(market_slice), 0))
-                market_columns.append(market_slice)
-            market_features = np.column_stack(market_columns) if market_columns else np.zeros((len(prices), 0))
-
-            features = self._make_features_for_symbol(prices, volumes, dates, market_features)
-
-            # Sliding window for supervised learning
-            for i in range(self.look_back, len(prices)-1):
-                window = features[i-self.look_back:i].flatten()
-                X_all.append(window)
-                # Target: next day's log return
-                y_all.append(np.log(prices[i+1]/prices[i]))
-
-        if not X_all:
+        # Market returns (a possible blocking download) and every symbol's
+        # history are fetched concurrently; feature math runs in worker threads
+        market_returns, *histories = await asyncio.gather(
+            asyncio.to_thread(self._get_market_returns),
+            *[price_cache.get_hourly_history(symbol) for symbol in self.symbols],
+            return_exceptions=True,
+        )
+        if isinstance(market_returns, Exception):
+            print(f"⚠️ Failed to load market returns: {market_returns}")
+            market_returns = {symbol: np.zeros(1) for symbol in self.market_indices}
+        self.market_returns = market_returns
+
+        parts = await asyncio.gather(*[
+            self._build_symbol_rows(symbol, history)
+            for symbol, history in zip(self.symbols, histories)
+        ])
+        parts = [part for part in parts if part is not None]
+        if not parts:
             return np.array([]), np.array([])
 
-        X_all = np.array(X_all)
-        y_all = np.array(y_all)
-        X_all_scaled = self.scaler.fit_transform(X_all)
-        return X_all_scaled, y_all
+        return await asyncio.to_thread(
+            self._assemble_dataset, parts, scaler if scaler is not None else StandardScaler()
+        )
+
+    def _assemble_dataset(self, parts, scaler):
+        """
+        Copy each symbol's windows straight into one preallocated float32
+        matrix, then fit `scaler` and standardize that matrix in place with
+        the same float32 arithmetic `predict_many` uses.
+        """
+        total = sum(len(y) for _, y in parts)
+        row_size = parts[0][0].shape[1] * parts[0][0].shape[2]
+        X_all = np.empty((total, row_size), dtype=np.float32)
+        y_all = np.empty(total)
+        offset = 0
+        for windows, y in parts:
+            n = len(y)
+            X_all[offset:offset + n].reshape(windows.shape)[...] = windows
+            y_all[offset:offset + n] = y
+            offset += n
+        scaler.fit(X_all)
+        mean, inv_scale = _scaling_params(scaler)
+        np.subtract(X_all, mean, out=X_all)
+        np.multiply(X_all, inv_scale, out=X_all)
+        return X_all, y_all
+
+    async def _build_symbol_rows(self, symbol, history):
+        if isinstance(history, Exception):
+            print(f"⚠️ Failed to load history for {symbol}: {history}")
+            return None
+        prices, volumes, dates = history
+        if len(prices) < self.look_back + 30:
+            return None
+        return await asyncio.to_thread(self._symbol_training_rows, prices, volumes, dates)
+
+    def _symbol_training_rows(self, prices, volumes, dates):
+        """
+        Supervised rows for one symbol: windows[k] is the (look_back, F)
+        feature window starting at bar k (a view, not a copy), the target
+        is the next log return.
+        """
+        prices = np.array(prices)
+        volumes = np.array(volumes)
+        market_features = self._market_features(len(prices))
+
+        features = self._make_features_for_symbol(prices, volumes, dates, market_features)
+
+        # Sliding windows for supervised learning: row k holds features[k:k+look_back]
+        num_features = features.shape[1]
+        windows = np.lib.stride_tricks.sliding_window_view(
+            features, (self.look_back, num_features)
+        )[:-2, 0]
+        # Target: next step's log return
+        y = np.log(prices[self.look_back+1:] / prices[self.look_back:-1])
+        return windows, y
+
+    # -----------------------------
+    # Fit off the event loop
+    # -----------------------------
+    async def _fit_and_swap(self, X_train, y_train, scaler):
+        """
+        Fit a fresh estimator in a worker thread, then swap it in together with
+        its scaler so concurrent predictions never see a half-trained model.
+        """
+        model = XGBRegressor(**self.model.get_params())
+        # float32 is the histogram quantizer's native dtype; halves the training copy
+        X_train = np.asarray(X_train, dtype=np.float32)
+        await asyncio.to_thread(model.fit, X_train, y_train)
+        session = await asyncio.to_thread(_onnx_session, model)
+        self._swap_serving(model, scaler, session)
 
     # -----------------------------
     # Train model
@@ -285,7 +461,8 @@ class XGBoostPredictor:
         Trains the XGBoost model using the global dataset.
         Uses walk-forward validation and prints validation MAE.
         """
-        X, y = await self._build_global_dataset()
+        scaler = StandardScaler()
+        X, y = await self._build_global_dataset(scaler=scaler)
         if len(X) == 0:
             return
 
@@ -295,11 +472,10 @@ class XGBoostPredictor:
 
         X_train, y_train, X_val, y_val = split
 
-        self.model.fit(X_train, y_train)
-        self.trained = True
-        self.save_artifacts()
+        await self._fit_and_swap(X_train, y_train, scaler)
+        await asyncio.to_thread(self.save_artifacts)
 
-        preds = self.model.predict(X_val)
+        preds = await asyncio.to_thread(self.model.predict, X_val)
         error = np.mean(np.abs(preds - y_val))
         print(f"📊 Validation MAE (log-return): {error:.5f}")
 
@@ -310,7 +486,8 @@ class XGBoostPredictor:
         Returns:
             dict: metrics for model vs baseline
         """
-        X, y = await self._build_global_dataset()
+        scaler = StandardScaler()
+        X, y = await self._build_global_dataset(scaler=scaler)
         if len(X) == 0:
             return {}
 
@@ -319,10 +496,9 @@ class XGBoostPredictor:
             return {}
 
         X_train, y_train, X_val, y_val = split
-        self.model.fit(X_train, y_train)
-        self.trained = True
+        await self._fit_and_swap(X_train, y_train, scaler)
 
-        preds = self.model.predict(X_val)
+        preds = await asyncio.to_thread(self.model.predict, X_val)
         mae_model = float(np.mean(np.abs(preds - y_val)))
 
         baseline = np.zeros_like(y_val)
@@ -368,46 +544,106 @@ class XGBoostPredictor:
         """
         if not self.trained or volumes is None:
             return []
+        return self.predict_many([(prices, volumes, dates)], steps=steps)[0]
 
-        prices = list(prices)
-        volumes = list(volumes)
-        if dates:
-            timestamps = list(pd.to_datetime(pd.Series(dates), errors="coerce"))
-        else:
-            timestamps = [pd.Timestamp.utcnow()] * len(prices)
-        preds = []
-
-        for _ in range(steps):
-            window_prices = prices[-self.look_back:]
-            window_volumes = volumes[-self.look_back:]
-            window_dates = timestamps[-self.look_back:]
-
-            market_columns = []
-            for market_symbol in self.market_indices:
-                market_slice = self.market_returns.get(market_symbol, np.zeros(1))[-self.look_back:]
-                if len(market_slice) < self.look_back:
-                    market_slice = np.pad(market_slice, (self.look_back-len(market_slice), 0))
-                market_columns.append(market_slice)
-            market_features = np.column_stack(market_columns) if market_columns else np.zeros((self.look_back, 0))
-
-            features = self._make_features_for_symbol(
-                window_prices,
-                window_volumes,
-                window_dates,
-                market_features,
-            )
-            window = self.scaler.transform(features.flatten().reshape(1, -1))
-            pred_ret = float(self.model.predict(window)[0])
+    def _market_features(self, n):
+        """
+        Last `n` returns of each market index as columns, zero-padded at the
+        front when an index has shorter history. Filled in one buffer.
+        """
+        market_features = np.zeros((n, len(self.market_indices)))
+        for j, market_symbol in enumerate(self.market_indices):
+            market_slice = np.ravel(self.market_returns.get(market_symbol, np.zeros(1)))[-n:]
+            market_features[n - len(market_slice):, j] = market_slice
+        return market_features
 
-            next_price = prices[-1] * np.exp(pred_ret)
-            preds.append(round(next_price, 2))
+    def _predict_market_features(self):
+        """Market return columns for the most recent look_back window."""
+        return self._market_features(self.look_back)
 
-            # Append predicted price and carry last volume forward
-            prices.append(next_price)
-            volumes.append(volumes[-1])
-            timestamps.append(timestamps[-1] + pd.Timedelta(hours=1))
+    def predict_many(self, series, steps=10):
+        """
+        Recursive multi-step prediction for several symbols at once.
+        Each step stacks every symbol's feature window into one matrix, so the
+        scaler and model run once per step rather than once per symbol.
+        Args:
+            series (list[tuple]): (prices, volumes, dates) per symbol
+        Returns:
+            list[list[float]]: predicted prices, in input order
+        """
+        # One read: the whole batch uses a single consistent fit
+        model, _, session, mean, inv_scale = self._serving
+        if not self.trained or mean is None:
+            return [[] for _ in series]
+        if not series:
+            return []
 
-        return preds
+        look_back = self.look_back
+        market_features = self._predict_market_features()
+        num_features = NUM_PRICE_FEATURES + 2 + market_features.shape[1]
+        size = look_back + steps
+
+        # Per-symbol rows hold the last look_back observations followed by
+        # one slot per predicted step; step k reads the window [k, k + look_back).
+        # Time features for future steps are known up front (hourly cadence).
+        active = [
+            idx for idx, (prices, volumes, _) in enumerate(series)
+            if len(prices) >= look_back and len(volumes) >= look_back
+        ]
+        if not active:
+            return [[] for _ in series]
+
+        price_buf = np.empty((len(active), size))
+        volume_buf = np.empty((len(active), size))
+        hours = np.zeros((len(active), size))
+        weekdays = np.zeros((len(active), size))
+        for row, idx in enumerate(active):
+            prices, volumes, dates = series[idx]
+            price_buf[row, :look_back] = prices[-look_back:]
+            volume_buf[row, :look_back] = volumes[-look_back:]
+
+            if dates:
+                window_dates = _to_datetime64(list(dates[-look_back:]))
+            else:
+                window_dates = np.full(look_back, np.datetime64("now", "m"))  # UTC
+            last_ts = window_dates[-1]
+            if not np.isnat(last_ts):
+                window_dates = np.concatenate(
+                    [window_dates, last_ts + np.arange(1, steps + 1).astype("timedelta64[h]")]
+                )
+            hour, weekday = _hour_weekday(window_dates)
+            hours[row, :len(hour)] = hour / 23.0
+            weekdays[row, :len(weekday)] = weekday / 6.0
+
+        # onnxruntime session when available, else the native booster; both skip
+        # the sklearn wrapper's validation and DMatrix build per step
+        booster = model.get_booster()
+        # Window features are recomputed from the window itself each step (EMA
+        # seeds and warm-up back-fill depend on where it starts), so rows don't
+        # carry over between steps; all symbols are filled in one compiled pass.
+        # float32 like the training matrix: features are rounded to float32 before
+        # scaling there too, and the model consumes float32 without another copy
+        windows = np.empty((len(active), look_back, num_features), dtype=np.float32)
+        X = windows.reshape(len(active), look_back * num_features)
+        for k in range(steps):
+            fill_windows(price_buf, volume_buf, hours, weekdays, market_features, k, look_back, windows)
+
+            np.subtract(X, mean, out=X)
+            np.multiply(X, inv_scale, out=X)
+            if session is not None:
+                pred_rets = session.run(None, {"input": X})[0].ravel()
+            else:
+                pred_rets = booster.inplace_predict(X)
+
+            # Compound every symbol's price in one vectorized step; carry last volume forward
+            last = k + look_back - 1
+            np.multiply(price_buf[:, last], np.exp(pred_rets.astype(np.float64)), out=price_buf[:, last + 1])
+            volume_buf[:, last + 1] = volume_buf[:, last]
+
+        results = [[] for _ in series]
+        for idx, row in zip(active, price_buf[:, look_back:].round(2).tolist()):
+            results[idx] = row
+        return results
 
     # -----------------------------
     # Generate high/low price bands
@@ -417,15 +653,24 @@ class XGBoostPredictor:
         Computes upper and lower bands for predicted prices for visualization.
         """
         preds = self.predict(prices, volumes, steps, dates=dates)
-        high = [p * (1 + 0.01 + i * 0.002) for i, p in enumerate(preds)]
-        low = [p * (1 - 0.01 - i * 0.002) for i, p in enumerate(preds)]
+        return self.price_bands(preds)
+
+    @staticmethod
+    def price_bands(preds):
+        """High/low bands around already-predicted prices, widening per step."""
+        preds = np.asarray(preds, dtype=np.float64)
+        band = 0.01 + 0.002 * np.arange(len(preds))
+        high = (preds * (1.0 + band)).round(2).tolist()
+        low = (preds * (1.0 - band)).round(2).tolist()
         return high, low
 
 
 # -----------------------------
 # Factory function & global predictor
 # -----------------------------
+@lru_cache(maxsize=None)
 def get_predictor(model_type="xgb"):
+    """One shared predictor per model type; repeated calls return the same instance."""
     if model_type == "xgb":
         return XGBoostPredictor()
 
@@ -1,18 +1,59 @@
 import asyncio
-from .predictor import get_predictor
+import os
+from .predictor import predictor
+from ..config.settings import settings
+
+
+def _artifact_mtime():
+    """mtime of the saved model metadata (written last on save), or None if absent."""
+    try:
+        return os.stat(os.path.join(settings.MODEL_DIR, settings.MODEL_META_FILE)).st_mtime_ns
+    except OSError:
+        return None
 
 class ModelRegistry:
     def __init__(self):
         self.model = None
         self.lock = asyncio.Lock()
         self.ready = False
+        self._artifact_mtime = None
+
+    async def load(self, train: bool = True):
+        """
+        Load the shared predictor from saved artifacts, training it when none
+        are usable. With train=False (non-leader workers) the registry stays
+        empty until the leader has saved artifacts.
+        """
+        async with self.lock:
+            if self.model is not None:
+                return  # a concurrent caller finished the load while we waited
+            # Warm the process-wide predictor so every caller shares one model
+            model = predictor
+            self._artifact_mtime = _artifact_mtime()
+            # Artifact loading fetches market returns over the network; keep it off the loop
+            if not await asyncio.to_thread(model.load_artifacts):
+                if not train:
+                    return
+                await model.train()
+            self.model = model
+            self.ready = True
 
-    async def load(self):
+    async def reload_if_changed(self):
+        """
+        Pick up artifacts saved by another worker since the last load.
+        Returns True if a newer model was loaded.
+        """
+        mtime = _artifact_mtime()
+        if mtime is None or mtime == self._artifact_mtime:
+            return False
         async with self.lock:
-            self.model = get_predictor("xgb")
-            if not self.model.load_artifacts():
-                await self.model.train()
+            # Recorded even if loading fails, so a bad save isn't retried every poll
+            self._artifact_mtime = mtime
+            if not await asyncio.to_thread(predictor.load_artifacts):
+                return False
+            self.model = predictor
             self.ready = True
+            return True
 
     def get(self):
         return self.model
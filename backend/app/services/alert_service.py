@@ -1,21 +1,35 @@
 # app/services/alert_service.py
 
-from typing import Callable, Dict
+from typing import Callable, Dict, Tuple
 import asyncio
+import math
 import numpy as np
 import httpx
 from ..utils.logger import log  # use the existing logger object
-from .price_cache import PriceCache
+from .price_cache import price_cache
 from ..config.settings import settings
 
 logger = log  # optional alias
-price_cache = PriceCache()  # shared cache instance
 
 
 class AlertService:
     def __init__(self):
         self.thresholds: Dict[str, float] = {}       # e.g. {"AAPL": 180.0}
         self.subscribers: Dict[str, Callable] = {}   # userId -> callback fn
+        self._stats: Dict[str, Tuple[int, float, float]] = {}  # symbol -> (n, mean, M2), Welford
+        self._seeded_at: Dict[str, str | None] = {}  # symbol -> last hourly bar the stats were seeded from
+        self._client: httpx.AsyncClient | None = None  # webhook client, reused across alerts
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=settings.ALERT_WEBHOOK_TIMEOUT)
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled webhook client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     def set_threshold(self, symbol: str, price: float):
         logger.info(f"Set threshold for {symbol}: {price}")
@@ -27,19 +41,24 @@ class AlertService:
 
     async def dispatch_alert(self, message: dict):
         logger.info(f"Dispatching alert: {message}")
+        # Webhook and subscribers run concurrently; one slow or failing receiver
+        # doesn't hold up (or cancel) the others
+        receivers = list(self.subscribers.items())
+        calls = [cb(message) for _, cb in receivers]
         if settings.ALERT_WEBHOOK_URL:
-            await self.send_webhook(message)
-        for sub, cb in self.subscribers.items():
-            await cb(message)
+            calls.append(self.send_webhook(message))
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for (sub, _), result in zip(receivers, results):
+            if isinstance(result, Exception):
+                logger.error(f"Alert subscriber {sub} failed: {result}")
 
     async def send_webhook(self, message: dict):
         try:
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    settings.ALERT_WEBHOOK_URL,
-                    json=message,
-                    timeout=settings.ALERT_WEBHOOK_TIMEOUT,
-                )
+            await self._get_client().post(
+                settings.ALERT_WEBHOOK_URL,
+                json=message,
+                timeout=settings.ALERT_WEBHOOK_TIMEOUT,
+            )
         except Exception as e:
             logger.error(f"Webhook delivery failed: {e}")
 
@@ -54,26 +73,46 @@ class AlertService:
                     "threshold": threshold
                 })
 
-    async def ai_anomaly_detection(self, symbol: str, history: list[float]):
+    async def update_and_check(self, symbol: str, price: float):
         """
         Simple AI anomaly detection using z-score.
+        Folds each new price into a running mean/variance (Welford), so a check
+        is O(1) instead of a pass over the full history. The stats are seeded
+        from the cached hourly history and re-seeded whenever that history
+        gains a bar, so they only carry live ticks since the last refresh.
         """
-        if len(history) < 10:
+        prices, _, dates = await price_cache.get_hourly_history(symbol)
+        seed_key = dates[-1] if dates else None
+        if symbol not in self._stats or self._seeded_at.get(symbol) != seed_key:
+            self._seeded_at[symbol] = seed_key
+            if len(prices) and prices[-1] == price:
+                # The cache already ends with this price; fold it in once, below
+                prices = prices[:-1]
+            n = len(prices)
+            self._stats[symbol] = (
+                (n, float(np.mean(prices)), float(np.var(prices)) * n) if n else (0, 0.0, 0.0)
+            )
+
+        n, mean, m2 = self._stats[symbol]
+        n += 1
+        delta = price - mean
+        mean += delta / n
+        m2 += delta * (price - mean)
+        self._stats[symbol] = (n, mean, m2)
+
+        if n < 10:
             return  # Not enough data
 
-        mean = np.mean(history)
-        std = np.std(history)
-        last = history[-1]
-
+        std = math.sqrt(m2 / n)
         if std == 0:
             return
 
-        z_score = abs((last - mean) / std)
+        z_score = abs((price - mean) / std)
         if z_score >= 2.5:
             await self.dispatch_alert({
                 "type": "anomaly",
                 "symbol": symbol,
-                "price": last,
+                "price": price,
                 "z_score": float(z_score)
             })
 
@@ -92,47 +131,57 @@ async def alert_monitor_loop():
     alert_service.set_threshold("AAPL", 180.0)
     alert_service.set_threshold("TSLA", 900.0)
 
-    while True:
-        try:
-            symbols = await price_cache.get_tracked_symbols()
-            for symbol in symbols:
-                price = await price_cache.get_price(symbol)
-                if price is None:
-                    continue
-
-                await alert_service.check_thresholds(symbol, float(price))
-
-                history = await price_cache.get_history(symbol)
-                if history:
-                    await alert_service.ai_anomaly_detection(symbol, history)
-
-                # Data freshness check (hourly data)
-                dates = await price_cache.get_hourly_dates(symbol, limit=48)
-                if dates:
-                    try:
-                        last = np.datetime64(dates[-1])
-                        age_seconds = (np.datetime64("now") - last) / np.timedelta64(1, "s")
-                        if age_seconds > settings.HOURLY_DATA_MAX_AGE_SECONDS:
-                            await alert_service.dispatch_alert({
-                                "type": "data_stale",
-                                "symbol": symbol,
-                                "age_seconds": float(age_seconds),
-                                "max_age_seconds": settings.HOURLY_DATA_MAX_AGE_SECONDS,
-                            })
-
-                        if len(dates) > 1:
-                            gaps = np.diff(np.array(dates, dtype="datetime64[m]"))
-                            max_gap_minutes = float(np.max(gaps) / np.timedelta64(1, "m"))
-                            if max_gap_minutes > 90:
-                                await alert_service.dispatch_alert({
-                                    "type": "data_gap",
-                                    "symbol": symbol,
-                                    "max_gap_minutes": max_gap_minutes,
-                                })
-                    except Exception as e:
-                        logger.error(f"Data freshness check failed for {symbol}: {e}")
-
-            await asyncio.sleep(2)  # alert checking interval
-        except Exception as e:
-            logger.error(f"Error in alert_monitor_loop: {e}")
-            await asyncio.sleep(5)
+    # Live price last folded into the anomaly stats, per symbol
+    last_folded: Dict[str, float] = {}
+
+    async def check_symbol(symbol: str):
+        price = await price_cache.get_price(symbol)
+        if price is None:
+            return
+
+        await alert_service.check_thresholds(symbol, float(price))
+
+        # Only price changes update the running stats: the live source re-saves
+        # the same quote (e.g. the previous close) on every fetch
+        if price != last_folded.get(symbol):
+            last_folded[symbol] = price
+            await alert_service.update_and_check(symbol, float(price))
+
+        # Data freshness check (hourly data)
+        dates = await price_cache.get_hourly_dates(symbol, limit=48)
+        if dates:
+            try:
+                last = np.datetime64(dates[-1])
+                age_seconds = (np.datetime64("now") - last) / np.timedelta64(1, "s")
+                if age_seconds > settings.HOURLY_DATA_MAX_AGE_SECONDS:
+                    await alert_service.dispatch_alert({
+                        "type": "data_stale",
+                        "symbol": symbol,
+                        "age_seconds": float(age_seconds),
+                        "max_age_seconds": settings.HOURLY_DATA_MAX_AGE_SECONDS,
+                    })
+
+                if len(dates) > 1:
+                    gaps = np.diff(np.array(dates, dtype="datetime64[m]"))
+                    max_gap_minutes = float(np.max(gaps) / np.timedelta64(1, "m"))
+                    if max_gap_minutes > 90:
+                        await alert_service.dispatch_alert({
+                            "type": "data_gap",
+                            "symbol": symbol,
+                            "max_gap_minutes": max_gap_minutes,
+                        })
+            except Exception as e:
+                logger.error(f"Data freshness check failed for {symbol}: {e}")
+
+    try:
+        while True:
+            try:
+                symbols = await price_cache.get_tracked_symbols()
+                # Symbols are independent; check them concurrently
+                await asyncio.gather(*(check_symbol(symbol) for symbol in symbols))
+                await asyncio.sleep(2)  # alert checking interval
+            except Exception as e:
+                logger.error(f"Error in alert_monitor_loop: {e}")
+                await asyncio.sleep(5)
+    finally:
+        await alert_service.aclose()
@@ -1,6 +1,9 @@
 import asyncio
+import os
+import time
 from typing import Tuple
 import httpx
+import numpy as np
 import yfinance as yf
 from ..utils.logger import log
 from .price_cache import price_cache
@@ -8,6 +11,65 @@ from ..config.settings import settings
 
 logger = log
 
+# -----------------------------
+# Yahoo Finance history with an on-disk cache
+# -----------------------------
+_tickers: dict[str, yf.Ticker] = {}
+
+
+def _get_ticker(symbol: str) -> yf.Ticker:
+    """Reuse one Ticker (and its HTTP session state) per symbol."""
+    ticker = _tickers.get(symbol)
+    if ticker is None:
+        ticker = _tickers.setdefault(symbol, yf.Ticker(symbol))
+    return ticker
+
+
+def _history_cache_path(symbol: str, period: str, interval: str) -> str:
+    return os.path.join(settings.HISTORY_CACHE_DIR, f"{symbol}_{period}_{interval}.npz")
+
+
+def _download_history(symbol: str, period: str, interval: str, date_format: str):
+    """
+    Closing prices, volumes and formatted dates for a symbol, served from an
+    on-disk npz cache while it is younger than the interval's TTL.
+    Blocking; call from a worker thread.
+
+    Returns:
+        tuple | None: (close, volume, dates), or None when Yahoo has no data
+    """
+    ttl = (
+        settings.DAILY_HISTORY_CACHE_SECONDS if interval == "1d"
+        else settings.HOURLY_HISTORY_CACHE_SECONDS
+    )
+    path = _history_cache_path(symbol, period, interval)
+    try:
+        if time.time() - os.path.getmtime(path) < ttl:
+            with np.load(path) as cached:
+                return cached["close"], cached["volume"], cached["dates"].tolist()
+    except (OSError, KeyError, ValueError):
+        pass
+
+    # Ticker.history: single-level columns, no multi-ticker download machinery
+    data = _get_ticker(symbol).history(period=period, interval=interval, auto_adjust=True)
+    if data.empty:
+        return None
+
+    close = data["Close"].ffill().to_numpy(dtype=float)
+    volume = data["Volume"].ffill().to_numpy(dtype=float)
+    dates = data.index.strftime(date_format).tolist()
+
+    try:
+        os.makedirs(settings.HISTORY_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as handle:
+            np.savez(handle, close=close, volume=volume, dates=np.array(dates))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Failed to cache {interval} history for {symbol}: {e}")
+    return close, volume, dates
+
+
 # -----------------------------
 # PriceFetcher: Handles fetching live and historical price data
 # -----------------------------
@@ -23,6 +85,22 @@ class PriceFetcher:
         self.api_key = settings.POLYGON_API_KEY
         
         self.base = "https://api.polygon.io/v2/aggs/ticker/"
+        # One pooled client reused across requests (keep-alive), created lazily
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=20),
+                timeout=5.0,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     # -----------------------------
     # Fetch latest live price and volume
@@ -43,15 +121,14 @@ class PriceFetcher:
 
         url = f"{self.base}{symbol}/prev?apiKey={self.api_key}"
 
-        async with httpx.AsyncClient() as client:
-            try:
-                r = await client.get(url, timeout=5)
-                r.raise_for_status()
-                d = r.json()["results"][0]
-                return float(d["c"]), float(d["v"])
-            except Exception as e:
-                logger.error(f"Live fetch failed {symbol}: {e}")
-                return None, None
+        try:
+            r = await self._get_client().get(url, timeout=5)
+            r.raise_for_status()
+            d = r.json()["results"][0]
+            return float(d["c"]), float(d["v"])
+        except Exception as e:
+            logger.error(f"Live fetch failed {symbol}: {e}")
+            return None, None
 
     # -----------------------------
     # Preload historical daily prices
@@ -64,23 +141,13 @@ class PriceFetcher:
             symbol (str): Stock or crypto ticker
             period (str): Duration of history, e.g., "5y"
         """
-        data = yf.download(
-            symbol,
-            period=period,
-            interval="1d",
-            auto_adjust=True,
-            progress=False,
-            group_by="column",
-        )
-
-        if data.empty:
+        history = await asyncio.to_thread(_download_history, symbol, period, "1d", "%Y-%m-%d")
+        if history is None:
             logger.warning(f"No daily history for {symbol}")
             return
 
-        # Extract daily closing prices, volumes, and dates
-        close = data["Close"].ffill().squeeze().tolist()
-        volume = data["Volume"].ffill().squeeze().tolist()
-        dates = data.index.strftime("%Y-%m-%d").tolist()
+        # Daily closing prices, volumes, and dates
+        close, volume, dates = history
 
         # Save to Redis cache
         await price_cache.save_daily_history(symbol, close, volume, dates)
@@ -93,22 +160,12 @@ class PriceFetcher:
         """
         Download historical hourly OHLCV data from Yahoo Finance and save to cache.
         """
-        data = yf.download(
-            symbol,
-            period=period,
-            interval="60m",
-            auto_adjust=True,
-            progress=False,
-            group_by="column",
-        )
-
-        if data.empty:
+        history = await asyncio.to_thread(_download_history, symbol, period, "60m", "%Y-%m-%d %H:%M")
+        if history is None:
             logger.warning(f"No hourly history for {symbol}")
             return
 
-        close = data["Close"].ffill().squeeze().tolist()
-        volume = data["Volume"].ffill().squeeze().tolist()
-        dates = data.index.strftime("%Y-%m-%d %H:%M").tolist()
+        close, volume, dates = history
 
         await price_cache.save_hourly_history(symbol, close, volume, dates)
         logger.info(f"📦 Preloaded {len(close)} hourly candles for {symbol}")
@@ -121,22 +178,36 @@ async def fetch_live_prices_loop():
     """
     Continuously fetch live prices for all symbols in settings.SYMBOLS.
     Saves prices and volumes to the cache.
-    Loops indefinitely with configurable interval and per-symbol delay.
+    Symbols are fetched concurrently, at most LIVE_FETCH_CONCURRENCY at a time,
+    then the loop waits FETCH_INTERVAL before the next batch.
     """
     fetcher = PriceFetcher()
-    while True:
-        try:
-            for symbol in settings.SYMBOLS:
-                price, volume = await fetcher.fetch_price_and_volume(symbol)
-                if price is not None:
-                    await price_cache.save_live_price(symbol, price, volume)
+    semaphore = asyncio.Semaphore(settings.LIVE_FETCH_CONCURRENCY)
 
-                # Small delay per symbol to avoid API rate limits
-                await asyncio.sleep(1)
+    async def fetch_and_save(symbol: str):
+        # Bounded concurrency stands in for the old per-symbol delay (API rate limits)
+        async with semaphore:
+            price, volume = await fetcher.fetch_price_and_volume(symbol)
+        if price is not None:
+            await price_cache.save_live_price(symbol, price, volume)
 
-            # Wait for configured fetch interval before next batch
-            await asyncio.sleep(settings.FETCH_INTERVAL)
-        except Exception as e:
-            logger.error(f"fetch_live_prices_loop error: {e}")
-            # Wait a bit before retrying on errors
-            await asyncio.sleep(5)
+    try:
+        while True:
+            try:
+                symbols = list(settings.SYMBOLS)
+                results = await asyncio.gather(
+                    *(fetch_and_save(symbol) for symbol in symbols),
+                    return_exceptions=True,
+                )
+                for symbol, result in zip(symbols, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Live price save failed {symbol}: {result}")
+
+                # Wait for configured fetch interval before next batch
+                await asyncio.sleep(settings.FETCH_INTERVAL)
+            except Exception as e:
+                logger.error(f"fetch_live_prices_loop error: {e}")
+                # Wait a bit before retrying on errors
+                await asyncio.sleep(5)
+    finally:
+        await fetcher.aclose()
@@ -1,7 +1,9 @@
 # app/services/prediction_service.py
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
 from ..services.price_cache import price_cache
 from ..utils.logger import log
 from ..models.registry import model_registry
@@ -9,6 +11,80 @@ from app.models.predictor import predictor
 
 logger = log
 
+
+@lru_cache(maxsize=512)
+def _future_date_strs(last_date_str: str, steps: int) -> tuple[str, ...]:
+    """
+    Future hourly timestamps after `last_date_str`, skipping weekends.
+    Pure in its inputs, so repeated requests for the same last bar are cached.
+    """
+    last_date = np.datetime64(datetime.strptime(last_date_str, "%Y-%m-%d %H:%M"), "m")
+    # Every `steps` weekday hours fit in this many calendar hours (5 of 7 days count)
+    span = steps + (steps // 120 + 2) * 48
+    candidates = last_date + np.arange(1, span + 1) * np.timedelta64(60, "m")
+    weekdays = (candidates.astype("datetime64[D]").astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    future = candidates[weekdays < 5][:steps]  # Mon-Fri only
+    return tuple(s.replace("T", " ") for s in np.datetime_as_string(future, unit="m"))
+
+
+# -----------------------------
+# Cross-symbol prediction batching
+# -----------------------------
+class PredictionBatcher:
+    """
+    Collects concurrent prediction requests and runs them through the model
+    together, so N symbols cost one stacked predict call per step instead of N.
+    """
+
+    MAX_BATCH = 32
+    MAX_WAIT = 0.005  # seconds to wait for more requests after the first
+
+    def __init__(self):
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def submit(self, model, prices, volumes, dates, steps: int):
+        """Enqueue one symbol's history and wait for its predicted prices."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((model, steps, (prices, volumes, dates), fut))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            t0 = loop.time()
+            while len(items) < self.MAX_BATCH and (loop.time() - t0) < self.MAX_WAIT:
+                try:
+                    items.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    await asyncio.sleep(0.001)
+
+            # Requests can only share a forward pass with the same model and horizon
+            groups: dict[tuple, list] = {}
+            for item in items:
+                groups.setdefault((id(item[0]), item[1]), []).append(item)
+
+            for batch in groups.values():
+                model, steps = batch[0][0], batch[0][1]
+                try:
+                    # CPU-bound feature math + inference; keep the event loop free
+                    results = await asyncio.to_thread(
+                        model.predict_many, [item[2] for item in batch], steps=steps
+                    )
+                except Exception as e:
+                    for *_, fut in batch:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    continue
+                for (*_, fut), row in zip(batch, results):
+                    if not fut.done():
+                        fut.set_result(row)
+
+
 # -----------------------------
 # Global-model prediction service
 # -----------------------------
@@ -29,6 +105,7 @@ class PredictionService:
         self.steps = steps
         # Dictionary of asyncio queues for subscribers (future feature for real-time updates)
         self._subscribers: dict[str, asyncio.Queue] = {}
+        self.batcher = PredictionBatcher()
 
     # -----------------------------
     # Core prediction method
@@ -41,23 +118,25 @@ class PredictionService:
         Returns:
             List[float]: Predicted prices
         """
+        # Fetch historical prices and volumes from cache
+        history = await price_cache.get_hourly_history(symbol)
+        return await self._predict_from_history(symbol, history, steps)
+
+    async def _predict_from_history(self, symbol: str, history, steps: int | None = None):
+        """Run `predict_next` on an already-fetched (prices, volumes, dates) history."""
         model = model_registry.get()
         if not model or not model.trained:
             logger.warning("Model not ready — skipping prediction")
             return []
 
-        # Fetch historical prices and volumes from cache
-        prices, volumes, dates = await price_cache.get_hourly_history(symbol)
-        if not prices or not volumes:
+        prices, volumes, dates = history
+        if len(prices) == 0 or len(volumes) == 0:
             logger.warning(f"No history for {symbol}")
             return []
 
         try:
-            return model.predict(
-                prices=prices,
-                volumes=volumes,
-                steps=steps or self.steps,
-                dates=dates,
+            return await self.batcher.submit(
+                model, prices, volumes, dates, steps=steps or self.steps
             )
         except Exception as e:
             logger.error(f"Prediction failed for {symbol}: {e}")
@@ -80,26 +159,17 @@ class PredictionService:
             }
         """
         steps = steps or self.steps
-        preds = await self.predict_next(symbol, steps=steps)
+        # One history read serves both the prediction and the last actual date
+        history = await price_cache.get_hourly_history(symbol)
+        preds = await self._predict_from_history(symbol, history, steps=steps)
         if not preds:
             return {"dates": [], "prices": [], "high": [], "low": []}
 
-        # Get last actual trading date from cache
-        _, _, dates = await price_cache.get_hourly_history(symbol)
-        last_date_str = dates[-1]
-        last_date = datetime.strptime(last_date_str, "%Y-%m-%d %H:%M")
+        dates = history[2]
+        predicted_dates = list(_future_date_strs(dates[-1], len(preds)))
 
-        # Generate future hourly timestamps, skipping weekends
-        predicted_dates = []
-        current_date = last_date
-        while len(predicted_dates) < len(preds):
-            current_date += timedelta(hours=1)
-            if current_date.weekday() < 5:  # Mon-Fri only
-                predicted_dates.append(current_date.strftime("%Y-%m-%d %H:%M"))
-
-        # Compute high/low bands based on historical volatility
-        prices, volumes, dates = await price_cache.get_hourly_history(symbol)
-        high, low = predictor.predict_high_low(prices, volumes, steps=steps, dates=dates)
+        # High/low bands around the same predicted path (no second inference)
+        high, low = predictor.price_bands(preds)
 
         return {
             "dates": predicted_dates,
@@ -108,6 +178,54 @@ class PredictionService:
             "low": low
         }
 
+    # -----------------------------
+    # Many symbols in one batched forward pass
+    # -----------------------------
+    async def predict_many_next_with_dates(self, symbols: list[str], steps: int | None = None):
+        """
+        Predict future prices for several symbols at once.
+        All histories go through a single `predict_many` call, so each step is
+        one stacked inference over every symbol instead of one call per symbol.
+
+        Returns:
+            dict: symbol -> same shape as `predict_next_with_dates`
+        """
+        steps = steps or self.steps
+        empty = {"dates": [], "prices": [], "high": [], "low": []}
+        model = model_registry.get()
+        if not model or not model.trained:
+            logger.warning("Model not ready — skipping prediction")
+            return {symbol: dict(empty) for symbol in symbols}
+
+        histories = await asyncio.gather(
+            *(price_cache.get_hourly_history(symbol) for symbol in symbols)
+        )
+        ready = [
+            (symbol, history) for symbol, history in zip(symbols, histories)
+            if len(history[0]) and len(history[1])
+        ]
+
+        try:
+            rows = await asyncio.to_thread(
+                model.predict_many, [history for _, history in ready], steps=steps
+            )
+        except Exception as e:
+            logger.error(f"Batched prediction failed for {symbols}: {e}")
+            rows = [[] for _ in ready]
+
+        results = {symbol: dict(empty) for symbol in symbols}
+        for (symbol, (_, _, dates)), preds in zip(ready, rows):
+            if not preds:
+                continue
+            high, low = predictor.price_bands(preds)
+            results[symbol] = {
+                "dates": list(_future_date_strs(dates[-1], len(preds))),
+                "prices": preds,
+                "high": high,
+                "low": low,
+            }
+        return results
+
 # -----------------------------
 # Global instance to be used throughout the app
 # -----------------------------
@@ -1,10 +1,44 @@
-import json
+import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+import numpy as np
+import orjson
 import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
 from ..utils.logger import log
 
 logger = log
 
+
+def _pack(values) -> bytes:
+    """Pack a numeric series into raw float64 bytes for a single Redis value."""
+    return np.asarray(values, dtype=np.float64).tobytes()
+
+
+def _unpack(raw: bytes | None) -> np.ndarray:
+    """Read-only float64 view over a packed series; empty if the key is missing."""
+    if not raw:
+        return np.empty(0, dtype=np.float64)
+    return np.frombuffer(raw, dtype=np.float64)
+
+
+def _dumps(payload) -> bytes:
+    """JSON-encode a prediction/alert; numpy scalars and datetimes pass straight through."""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _pack_dates(dates) -> bytes:
+    """Pack date strings into one newline-joined value."""
+    return "\n".join(dates).encode()
+
+
+def _unpack_dates(raw: bytes | None) -> list[str]:
+    """Inverse of `_pack_dates`; empty if the key is missing."""
+    if not raw:
+        return []
+    return raw.decode().split("\n")
+
 # -----------------------------
 # Redis-based caching for prices, volumes, predictions, and alerts
 # -----------------------------
@@ -18,6 +52,19 @@ class PriceCache:
         """
         self.redis_url = redis_url
         self.redis = None  # Will hold the Redis connection
+        self.redis_raw = None  # Same server, no response decoding (packed arrays)
+        self.max_connections = 64
+        # In-process history reads: (prefix, symbol) -> (expires_at, history),
+        # LRU-ordered and capped since request paths choose the symbol.
+        # Saves from this process invalidate immediately; the TTL bounds how
+        # long another worker's refresh can go unseen.
+        self.history_ttl = 60.0
+        self.history_cache_max = 256
+        self._history_cache: OrderedDict[tuple[str, str], tuple[float, tuple]] = OrderedDict()
+        # Bumped by every save; a read only caches if no save landed meanwhile
+        self._history_epoch = 0
+        self._connected = asyncio.Event()
+        self._connect_lock = asyncio.Lock()
         # Default symbols to track; can be updated dynamically
         self.tracked_symbols = ["AAPL", "TSLA", "ETH-USD", "NVDA"]
 
@@ -26,15 +73,29 @@ class PriceCache:
     # -----------------------------
     async def connect(self):
         """
-        Establishes an async connection to Redis.
-        Connects only once to avoid repeated connections.
+        Establishes pooled async connections to Redis.
+        Runs once (serialized by a lock); afterwards it returns immediately.
         """
-        if not self.redis:
-            self.redis = await aioredis.from_url(
+        if self._connected.is_set():
+            return
+        async with self._connect_lock:
+            if self._connected.is_set():
+                return
+            pool = aioredis.ConnectionPool.from_url(
                 self.redis_url,
+                max_connections=self.max_connections,
                 encoding="utf-8",
                 decode_responses=True,
             )
+            raw_pool = aioredis.ConnectionPool.from_url(
+                self.redis_url,
+                max_connections=self.max_connections,
+            )
+            redis = aioredis.Redis(connection_pool=pool)
+            await redis.ping()
+            self.redis = redis
+            self.redis_raw = aioredis.Redis(connection_pool=raw_pool)
+            self._connected.set()
             logger.info("Connected to Redis")
 
     # -----------------------------
@@ -53,16 +114,22 @@ class PriceCache:
         Also maintains a rolling history of the last 500 prices.
         """
         await self.connect()
-        await self.redis.set(f"live:price:{symbol}", price)
-        await self.redis.set(
+        now = time.time()
+        # One round-trip for all writes; no atomicity needed
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(f"live:price:{symbol}", price)
+        pipe.set(
             f"live:price_ts:{symbol}",
-            datetime.now(timezone.utc).isoformat(),
+            datetime.fromtimestamp(now, timezone.utc).isoformat(),
         )
-        await self.redis.lpush(f"live:price_history:{symbol}", price)
-        await self.redis.ltrim(f"live:price_history:{symbol}", 0, 500)
+        # Epoch copy so freshness checks are a subtraction, not an ISO parse
+        pipe.set(f"live:price_ts_epoch:{symbol}", now)
+        pipe.lpush(f"live:price_history:{symbol}", price)
+        pipe.ltrim(f"live:price_history:{symbol}", 0, 500)
 
         if volume is not None:
-            await self.redis.set(f"live:volume:{symbol}", volume)
+            pipe.set(f"live:volume:{symbol}", volume)
+        await pipe.execute()
 
     async def get_live_price(self, symbol: str):
         """
@@ -78,6 +145,12 @@ class PriceCache:
         await self.connect()
         return await self.redis.get(f"live:price_ts:{symbol}")
 
+    async def get_live_timestamp_epoch(self, symbol: str) -> float | None:
+        """Fetch the latest live price timestamp for a symbol as epoch seconds."""
+        await self.connect()
+        val = await self.redis.get(f"live:price_ts_epoch:{symbol}")
+        return float(val) if val else None
+
     async def get_live_volume(self, symbol: str):
         """Fetch the latest live volume for a symbol."""
         await self.connect()
@@ -91,6 +164,11 @@ class PriceCache:
         """
         await self.connect()
         prices = await self.redis.lrange(f"live:price_history:{symbol}", 0, 1)
+        return self._change_percent(prices)
+
+    @staticmethod
+    def _change_percent(prices: list) -> float | None:
+        """Percent change from the two most recent entries of a price history list."""
         if len(prices) < 2:
             return None
         try:
@@ -102,6 +180,34 @@ class PriceCache:
             return None
         return ((latest - previous) / previous) * 100
 
+    async def get_live_bulk(self, symbols: list[str]) -> list[dict]:
+        """
+        Fetch price, change percent, volume and last update time (ISO and epoch)
+        for many symbols in one round-trip. Returns one dict per symbol, in the order given.
+        """
+        await self.connect()
+        pipe = self.redis.pipeline(transaction=False)
+        for symbol in symbols:
+            pipe.get(f"live:price:{symbol}")
+            pipe.lrange(f"live:price_history:{symbol}", 0, 1)
+            pipe.get(f"live:volume:{symbol}")
+            pipe.get(f"live:price_ts:{symbol}")
+            pipe.get(f"live:price_ts_epoch:{symbol}")
+        raw = await pipe.execute()
+
+        results = []
+        for i, symbol in enumerate(symbols):
+            price, history, volume, ts, ts_epoch = raw[i * 5:i * 5 + 5]
+            results.append({
+                "symbol": symbol,
+                "price": float(price) if price else None,
+                "change_percent": self._change_percent(history),
+                "volume": float(volume) if volume else None,
+                "last_update": ts,
+                "last_update_epoch": float(ts_epoch) if ts_epoch else None,
+            })
+        return results
+
     # Alias for backward compatibility
     async def get_price(self, symbol: str) -> float | None:
         return await self.get_live_price(symbol)
@@ -109,7 +215,7 @@ class PriceCache:
     # -----------------------------
     # DAILY HISTORICAL STORAGE
     # -----------------------------
-    async def save_daily_history(self, symbol: str, prices: list[float], volumes: list[float], dates: list[str]):
+    async def save_daily_history(self, symbol: str, prices, volumes, dates: list[str]):
         """
         Save full daily historical prices, volumes, and dates for a symbol.
         Clears previous data before saving new history.
@@ -131,37 +237,78 @@ class PriceCache:
         pipe.delete(volume_key)
         pipe.delete(date_key)
 
-        for p, v, d in zip(prices, volumes, dates):
-            pipe.rpush(price_key, p)
-            pipe.rpush(volume_key, v)
-            pipe.rpush(date_key, d)
+        # One packed value per series, so reads are three GETs and no per-item parsing
+        pipe.set(price_key, _pack(prices))
+        pipe.set(volume_key, _pack(volumes))
+        pipe.set(date_key, _pack_dates(dates))
 
         await pipe.execute()
+        self._invalidate_history("daily", symbol)
         logger.info(f"Saved {len(prices)} daily candles for {symbol}")
 
     async def get_daily_history(self, symbol: str, limit: int | None = None):
         """
         Retrieve full daily historical prices, volumes, and dates.
+        Prices and volumes are float64 arrays; dates are strings.
         Optionally return only the last `limit` entries.
         """
-        await self.connect()
-        prices = [float(x) for x in await self.redis.lrange(f"daily:prices:{symbol}", 0, -1)]
-        volumes = [float(x) for x in await self.redis.lrange(f"daily:volumes:{symbol}", 0, -1)]
-        dates = await self.redis.lrange(f"daily:dates:{symbol}", 0, -1)
+        prices, volumes, dates = await self._read_history("daily", symbol)
 
         if limit:
             prices = prices[-limit:]
             volumes = volumes[-limit:]
             dates = dates[-limit:]
 
-        return prices, volumes, dates
+        return prices, volumes, list(dates)
+
+    async def _read_history(self, prefix: str, symbol: str):
+        """
+        Full (prices, volumes, dates) for one series, served from the
+        in-process cache while fresh. Arrays are read-only views and dates a
+        tuple, so one caller can't alter what the next one reads.
+        """
+        key = (prefix, symbol)
+        now = time.monotonic()
+        hit = self._history_cache.get(key)
+        if hit is not None and hit[0] > now:
+            self._history_cache.move_to_end(key)
+            return hit[1]
+
+        epoch = self._history_epoch
+        await self.connect()
+        pipe = self.redis_raw.pipeline(transaction=False)
+        pipe.get(f"{prefix}:prices:{symbol}")
+        pipe.get(f"{prefix}:volumes:{symbol}")
+        pipe.get(f"{prefix}:dates:{symbol}")
+        # Keys written as lists by older versions fail with WRONGTYPE; read them
+        # as missing until the next save overwrites them
+        raw = await pipe.execute(raise_on_error=False)
+        for value in raw:
+            if isinstance(value, ResponseError) and not str(value).startswith("WRONGTYPE"):
+                raise value
+        raw_prices, raw_volumes, raw_dates = (
+            None if isinstance(value, ResponseError) else value for value in raw
+        )
+
+        history = (_unpack(raw_prices), _unpack(raw_volumes), tuple(_unpack_dates(raw_dates)))
+        # A save that landed while this read was in flight wins
+        if self._history_epoch == epoch:
+            self._history_cache[key] = (now + self.history_ttl, history)
+            self._history_cache.move_to_end(key)
+            if len(self._history_cache) > self.history_cache_max:
+                self._history_cache.popitem(last=False)
+        return history
+
+    def _invalidate_history(self, prefix: str, symbol: str):
+        self._history_cache.pop((prefix, symbol), None)
+        self._history_epoch += 1
 
     # Helper methods to get individual components
-    async def get_daily_prices(self, symbol: str, limit: int | None = None) -> list[float]:
+    async def get_daily_prices(self, symbol: str, limit: int | None = None) -> np.ndarray:
         prices, _, _ = await self.get_daily_history(symbol, limit=limit)
         return prices
 
-    async def get_daily_volumes(self, symbol: str, limit: int | None = None) -> list[float]:
+    async def get_daily_volumes(self, symbol: str, limit: int | None = None) -> np.ndarray:
         _, volumes, _ = await self.get_daily_history(symbol, limit=limit)
         return volumes
 
@@ -172,7 +319,7 @@ class PriceCache:
     # -----------------------------
     # HOURLY HISTORICAL STORAGE
     # -----------------------------
-    async def save_hourly_history(self, symbol: str, prices: list[float], volumes: list[float], dates: list[str]):
+    async def save_hourly_history(self, symbol: str, prices, volumes, dates: list[str]):
         """
         Save full hourly historical prices, volumes, and dates for a symbol.
         Clears previous data before saving new history.
@@ -190,36 +337,35 @@ class PriceCache:
         pipe.delete(volume_key)
         pipe.delete(date_key)
 
-        for p, v, d in zip(prices, volumes, dates):
-            pipe.rpush(price_key, p)
-            pipe.rpush(volume_key, v)
-            pipe.rpush(date_key, d)
+        # One packed value per series, so reads are three GETs and no per-item parsing
+        pipe.set(price_key, _pack(prices))
+        pipe.set(volume_key, _pack(volumes))
+        pipe.set(date_key, _pack_dates(dates))
 
         await pipe.execute()
+        self._invalidate_history("hourly", symbol)
         logger.info(f"Saved {len(prices)} hourly candles for {symbol}")
 
     async def get_hourly_history(self, symbol: str, limit: int | None = None):
         """
         Retrieve full hourly historical prices, volumes, and dates.
+        Prices and volumes are float64 arrays; dates are strings.
         Optionally return only the last `limit` entries.
         """
-        await self.connect()
-        prices = [float(x) for x in await self.redis.lrange(f"hourly:prices:{symbol}", 0, -1)]
-        volumes = [float(x) for x in await self.redis.lrange(f"hourly:volumes:{symbol}", 0, -1)]
-        dates = await self.redis.lrange(f"hourly:dates:{symbol}", 0, -1)
+        prices, volumes, dates = await self._read_history("hourly", symbol)
 
         if limit:
             prices = prices[-limit:]
             volumes = volumes[-limit:]
             dates = dates[-limit:]
 
-        return prices, volumes, dates
+        return prices, volumes, list(dates)
 
-    async def get_hourly_prices(self, symbol: str, limit: int | None = None) -> list[float]:
+    async def get_hourly_prices(self, symbol: str, limit: int | None = None) -> np.ndarray:
         prices, _, _ = await self.get_hourly_history(symbol, limit=limit)
         return prices
 
-    async def get_hourly_volumes(self, symbol: str, limit: int | None = None) -> list[float]:
+    async def get_hourly_volumes(self, symbol: str, limit: int | None = None) -> np.ndarray:
         _, volumes, _ = await self.get_hourly_history(symbol, limit=limit)
         return volumes
 
@@ -230,7 +376,7 @@ class PriceCache:
     # -----------------------------
     # Legacy helper methods (needed by trainer & alerts)
     # -----------------------------
-    async def get_history(self, symbol: str, limit: int | None = None) -> list[float]:
+    async def get_history(self, symbol: str, limit: int | None = None) -> np.ndarray:
         """Return historical closing prices for a symbol (legacy method)."""
         prices, _, _ = await self.get_hourly_history(symbol, limit=limit)
         return prices
@@ -241,13 +387,13 @@ class PriceCache:
     async def save_prediction(self, symbol: str, prediction: dict):
         """Save a prediction dict for a symbol in Redis."""
         await self.connect()
-        await self.redis.set(f"prediction:{symbol}", json.dumps(prediction))
+        await self.redis.set(f"prediction:{symbol}", _dumps(prediction))
 
     async def get_prediction(self, symbol: str):
         """Retrieve the latest prediction for a symbol from Redis."""
         await self.connect()
         raw = await self.redis.get(f"prediction:{symbol}")
-        return json.loads(raw) if raw else None
+        return orjson.loads(raw) if raw else None
 
     async def save_alert(self, alert: dict):
         """
@@ -255,14 +401,16 @@ class PriceCache:
         Only keeps the latest 20 alerts.
         """
         await self.connect()
-        await self.redis.lpush("alerts", json.dumps(alert))
-        await self.redis.ltrim("alerts", 0, 20)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lpush("alerts", _dumps(alert))
+        pipe.ltrim("alerts", 0, 20)
+        await pipe.execute()
 
     async def get_alerts(self):
         """Retrieve the most recent 20 alerts from Redis."""
         await self.connect()
         raw = await self.redis.lrange("alerts", 0, 20)
-        return [json.loads(x) for x in raw]
+        return [orjson.loads(x) for x in raw]
 
 
 # -----------------------------
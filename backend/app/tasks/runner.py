@@ -5,18 +5,31 @@ from datetime import datetime, timedelta
 from ..utils.logger import log
 from ..services.fetcher import fetch_live_prices_loop, PriceFetcher
 from ..services.alert_service import alert_monitor_loop
-from ..services.prediction_service import PredictionService
 from ..config.settings import settings
 from ..models.registry import model_registry
 
-# -----------------------------
-# Global prediction service instance
-# -----------------------------
-predictor_service = PredictionService()
-
 # -----------------------------
 # Preload historical data
 # -----------------------------
+async def _preload_hourly_for_all(fetcher: PriceFetcher):
+    """
+    Refresh hourly history for every tracked symbol concurrently,
+    at most HISTORY_FETCH_CONCURRENCY downloads at a time.
+    Failures are logged per symbol.
+    """
+    semaphore = asyncio.Semaphore(settings.HISTORY_FETCH_CONCURRENCY)
+
+    async def preload(symbol: str):
+        async with semaphore:
+            await fetcher.preload_hourly_history(symbol, period=settings.HOURLY_HISTORY_PERIOD)
+
+    symbols = list(settings.SYMBOLS)
+    results = await asyncio.gather(*(preload(symbol) for symbol in symbols), return_exceptions=True)
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            log.error(f"❌ Failed to preload {symbol}: {result}")
+
+
 async def preload_all_history():
     """
     Fetches and caches hourly historical prices for all symbols
@@ -25,13 +38,7 @@ async def preload_all_history():
     """
     fetcher = PriceFetcher()
     log.info("📦 Preloading hourly history...")
-
-    for symbol in settings.SYMBOLS:
-        try:
-            await fetcher.preload_hourly_history(symbol, period=settings.HOURLY_HISTORY_PERIOD)
-        except Exception as e:
-            log.error(f"❌ Failed to preload {symbol}: {e}")
-
+    await _preload_hourly_for_all(fetcher)
     log.info("✅ Hourly history preload complete")
 
 
@@ -45,8 +52,7 @@ async def hourly_history_refresh_loop():
     fetcher = PriceFetcher()
     while True:
         try:
-            for symbol in settings.SYMBOLS:
-                await fetcher.preload_hourly_history(symbol, period=settings.HOURLY_HISTORY_PERIOD)
+            await _preload_hourly_for_all(fetcher)
             await asyncio.sleep(settings.HOURLY_REFRESH_INTERVAL)
         except Exception as e:
             log.error(f"Hourly history refresh failed: {e}")
@@ -64,14 +70,35 @@ async def model_training_loop():
     """
     while True:
         try:
-            async with model_registry.lock:
-                await model_registry.model.train()
+            if model_registry.get() is None:
+                # Startup load failed or is still running; load() waits on the same lock
+                await model_registry.load()
+            else:
+                async with model_registry.lock:
+                    await model_registry.get().train()
             await asyncio.sleep(3600)  # wait 1 hour before next training
         except Exception as e:
             log.error(f"Training failed: {e}")
             await asyncio.sleep(300)  # wait 5 minutes before retrying
 
 
+# -----------------------------
+# Model reload loop (non-leader workers)
+# -----------------------------
+async def artifact_reload_loop():
+    """
+    Workers that don't train reload the artifacts the leader saves,
+    checking the metadata file's mtime every MODEL_RELOAD_INTERVAL seconds.
+    """
+    while True:
+        try:
+            if await model_registry.reload_if_changed():
+                log.info("🔄 Reloaded model artifacts saved by the training worker")
+        except Exception as e:
+            log.error(f"Model reload failed: {e}")
+        await asyncio.sleep(settings.MODEL_RELOAD_INTERVAL)
+
+
 # -----------------------------
 # Nightly backtest loop
 # -----------------------------
@@ -124,6 +151,49 @@ async def nightly_backtest_loop():
             await asyncio.sleep(300)
 
 
+# -----------------------------
+# One background-task leader per host
+# -----------------------------
+_leader_lock = None
+_is_leader: bool | None = None
+
+
+def _acquire_leader_lock() -> bool:
+    """
+    Under `uvicorn --workers N` every worker runs startup; only the worker
+    holding this file lock runs the fetch/train/backtest loops. The lock is
+    released by the OS when that process exits. It lives in MODEL_DIR, which
+    the app already writes to and which is specific to the deployment.
+    """
+    global _leader_lock
+    try:
+        import fcntl
+    except ImportError:  # Windows: single-worker deployments only
+        return True
+    path = os.path.join(settings.MODEL_DIR, ".background.lock")
+    try:
+        os.makedirs(settings.MODEL_DIR, exist_ok=True)
+        handle = open(path, "w")
+    except OSError as e:
+        log.error(f"Cannot open background lock {path}: {e}; not running background tasks here")
+        return False
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _leader_lock = handle
+    return True
+
+
+def is_leader() -> bool:
+    """Whether this worker runs the background loops and training; decided once per process."""
+    global _is_leader
+    if _is_leader is None:
+        _is_leader = _acquire_leader_lock()
+    return _is_leader
+
+
 # -----------------------------
 # Start all background tasks
 # -----------------------------
@@ -134,7 +204,18 @@ async def start_background_tasks():
       2. Fetch live prices continuously
       3. Retrain model periodically
       4. Monitor alerts in real-time
+    Idempotent: later calls return immediately so loops are never duplicated.
     """
+    if getattr(start_background_tasks, "_started", False):
+        log.warning("Background tasks already started; ignoring duplicate start")
+        return
+    start_background_tasks._started = True
+
+    if not is_leader():
+        log.info("Background tasks running in another worker; only reloading its model here")
+        await task_wrapper(artifact_reload_loop, "Model Reloader")
+        return
+
     log.info("🚀 Starting background task manager...")
 
     # Preload history first to ensure model has data
@@ -1,12 +1,15 @@
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from ..config.settings import settings
 
 # ---------------------------------------------------
 # Create a custom logger
 # ---------------------------------------------------
 log = logging.getLogger("AIStockBackend")
-log.setLevel(logging.DEBUG)
+log.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
 
 # ---------------------------------------------------
 # Formatting
@@ -27,7 +30,7 @@ file_format = logging.Formatter(
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(console_format)
-log.addHandler(console_handler)
+handlers = [console_handler]
 
 # ---------------------------------------------------
 # File Logging (optional: uncomment to enable)
@@ -39,7 +42,22 @@ log.addHandler(console_handler)
 # )
 # file_handler.setLevel(logging.DEBUG)
 # file_handler.setFormatter(file_format)
-# log.addHandler(file_handler)
+# handlers.append(file_handler)
+
+# ---------------------------------------------------
+# Handlers run on a listener thread; logging calls on the
+# event loop only enqueue the record
+# ---------------------------------------------------
+_log_queue = queue.SimpleQueue()
+_listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+_queue_handler = QueueHandler(_log_queue)
+# Records no handler would emit are dropped before prepare() formats them
+_queue_handler.setLevel(min(handler.level for handler in handlers))
+log.addHandler(_queue_handler)
+# Keep isEnabledFor() honest: DEBUG only lowers the level as far as a handler listens
+log.setLevel(max(log.level, _queue_handler.level))
 
 # ---------------------------------------------------
 # Disable logging propagation
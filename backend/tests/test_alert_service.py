@@ -0,0 +1,85 @@
+import asyncio
+
+import numpy as np
+
+from app.services.alert_service import AlertService
+
+
+def _cached_history(monkeypatch, prices, last_date="2026-01-14 16:00"):
+    from app.services import alert_service
+
+    async def get_hourly_history(symbol):
+        return np.asarray(prices, dtype=np.float64), None, [last_date] if len(prices) else []
+
+    monkeypatch.setattr(alert_service.price_cache, "get_hourly_history", get_hourly_history)
+
+
+def test_update_and_check_tracks_running_stats_and_flags_outliers(monkeypatch):
+    _cached_history(monkeypatch, [])
+    service = AlertService()
+    alerts = []
+
+    async def collect(message):
+        alerts.append(message)
+
+    service.register_subscriber("test", collect)
+    prices = [100.0, 101.0, 99.5, 100.5, 100.2, 99.8, 100.1, 100.4, 99.9, 100.3]
+
+    async def run():
+        for price in prices + [120.0]:
+            await service.update_and_check("AAPL", price)
+
+    asyncio.run(run())
+
+    n, mean, m2 = service._stats["AAPL"]
+    assert n == 11
+    assert np.isclose(mean, np.mean(prices + [120.0]))
+    assert np.isclose(np.sqrt(m2 / n), np.std(prices + [120.0]))
+    assert [a["type"] for a in alerts] == ["anomaly"]
+
+
+def test_update_and_check_seeds_without_double_counting_the_latest_price(monkeypatch):
+    history = [100.0, 101.0, 99.5, 100.5, 100.2, 99.8, 100.1, 100.4, 99.9, 100.3, 120.0]
+    _cached_history(monkeypatch, history)
+    service = AlertService()
+    asyncio.run(service.update_and_check("AAPL", 120.0))
+
+    n, mean, m2 = service._stats["AAPL"]
+    assert n == len(history)
+    assert np.isclose(mean, np.mean(history))
+    assert np.isclose(m2 / n, np.var(history))
+
+
+def test_update_and_check_reseeds_when_history_gains_a_bar(monkeypatch):
+    _cached_history(monkeypatch, [100.0, 101.0, 102.0])
+    service = AlertService()
+
+    async def run():
+        for price in (103.0, 104.0, 105.0):
+            await service.update_and_check("AAPL", price)
+        _cached_history(monkeypatch, [101.0, 102.0, 103.0], last_date="2026-01-14 17:00")
+        await service.update_and_check("AAPL", 106.0)
+
+    asyncio.run(run())
+
+    n, mean, _ = service._stats["AAPL"]
+    # Earlier live ticks are dropped; only the refreshed history plus the new tick remain
+    assert n == 4
+    assert np.isclose(mean, np.mean([101.0, 102.0, 103.0, 106.0]))
+
+
+def test_dispatch_alert_isolates_failing_subscribers():
+    service = AlertService()
+    received = []
+
+    async def failing(message):
+        raise RuntimeError("boom")
+
+    async def collect(message):
+        received.append(message)
+
+    service.register_subscriber("bad", failing)
+    service.register_subscriber("good", collect)
+
+    asyncio.run(service.dispatch_alert({"type": "test"}))
+    assert received == [{"type": "test"}]
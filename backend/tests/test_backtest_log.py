@@ -0,0 +1,91 @@
+from app.graphql import queries
+
+
+LINE = (
+    "2026-01-14 17:32:28 | MAE_model={mae:.6f} MAE_baseline=0.004530 "
+    "DirAcc_model=0.515 DirAcc_baseline=0.000 Val=200\n"
+)
+
+
+def test_load_backtest_rows_appends_incrementally(tmp_path):
+    path = tmp_path / "backtest.log"
+    path.write_text(LINE.format(mae=0.001) + LINE.format(mae=0.002), encoding="utf-8")
+
+    rows = queries._load_backtest_rows(str(path))
+    assert [r.mae_model for r in rows] == [0.001, 0.002]
+
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(LINE.format(mae=0.003))
+
+    rows = queries._load_backtest_rows(str(path))
+    assert [r.mae_model for r in rows] == [0.001, 0.002, 0.003]
+
+
+def test_load_backtest_rows_skips_unparseable_lines(tmp_path):
+    path = tmp_path / "backtest.log"
+    path.write_text(
+        "2026-01-14 17:32:28 | No backtest results (insufficient data)\n" + LINE.format(mae=0.004),
+        encoding="utf-8",
+    )
+
+    rows = queries._load_backtest_rows(str(path))
+    assert len(rows) == 1
+    assert rows[0].validation_size == 200
+
+
+def test_tail_lines_returns_last_lines(tmp_path):
+    path = tmp_path / "feature_importance.jsonl"
+    path.write_text("".join(f'{{"row": {i}}}\n' for i in range(100)), encoding="utf-8")
+
+    lines = queries._tail_lines(str(path), 3, approx_bytes_per_line=4)
+    assert lines == ['{"row": 97}', '{"row": 98}', '{"row": 99}']
+    assert len(queries._tail_lines(str(path), 500)) == 100
+
+
+def test_parse_backtest_line_normalizes_spaced_keys():
+    line = (
+        "2026-01-14 17:32:28 | MAE model=0.005 MAE baseline=0.004 "
+        "DirAcc model=0.515 DirAcc baseline=0.000 Val=200"
+    )
+    parsed = queries._parse_backtest_line(line)
+    assert parsed.mae_model == 0.005
+    assert parsed.directional_accuracy_baseline == 0.0
+
+
+def test_load_backtest_mae_array_skips_empty_runs(tmp_path):
+    path = tmp_path / "backtest.log"
+    lines = [LINE.format(mae=0.001 * i) for i in range(1, 5)]
+    lines.insert(2, "2026-01-14 17:32:28 | No backtest results (insufficient data)\n")
+    path.write_text("".join(lines), encoding="utf-8")
+
+    maes = queries._load_backtest_mae_array(str(path), 3)
+    assert maes.tolist() == [0.002, 0.003, 0.004]
+
+
+def test_load_backtest_mae_array_matches_parsed_rows(tmp_path):
+    path = tmp_path / "backtest.log"
+    lines = [LINE.format(mae=0.001 * i) for i in range(1, 4)]
+    # Has an MAE but no other metrics: rejected by the row parser, so not counted
+    lines.insert(1, "2026-01-14 17:32:28 | MAE_model=0.9\n")
+    path.write_text("".join(lines), encoding="utf-8")
+
+    maes = queries._load_backtest_mae_array(str(path), 10)
+    rows = queries._load_backtest_rows(str(path))
+    assert maes.tolist() == [r.mae_model for r in rows] == [0.001, 0.002, 0.003]
+
+
+def test_feature_importance_trend_skips_bad_lines(tmp_path, monkeypatch):
+    import asyncio
+
+    path = tmp_path / "feature_importance.jsonl"
+    path.write_text(
+        '{"timestamp": "t1", "features": [{"name": "rsi", "importance": 0.5}]}\n'
+        "not json\n"
+        '{"timestamp": "t2", "features": []}\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(queries.settings, "FEATURE_IMPORTANCE_LOG_PATH", str(path))
+
+    snapshots = asyncio.run(queries.Query().feature_importance_trend(limit=3))
+    assert [s.timestamp for s in snapshots] == ["t1", "t2"]
+    assert snapshots[0].features[0].name == "rsi"
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from app.models.features import build_features
+
+
+def _pandas_reference(prices, volumes):
+    """The pandas feature definitions the compiled kernels replace."""
+    p = pd.Series(prices)
+    log_returns = np.diff(np.log(prices), prepend=np.log(prices[0]))
+
+    delta = p.diff().fillna(0)
+    gain = delta.clip(lower=0).rolling(14, min_periods=1).mean()
+    loss = (-delta.clip(upper=0)).rolling(14, min_periods=1).mean()
+    rsi = 100 - (100 / (1 + gain / loss.replace(0, np.nan)))
+    rsi = rsi.mask((gain == 0) & (loss == 0), 50).fillna(100)
+
+    macd = p.ewm(span=12, adjust=False).mean() - p.ewm(span=26, adjust=False).mean()
+    macd_signal = macd.ewm(span=9, adjust=False).mean()
+
+    v = pd.Series(volumes)
+    vol_mean = v.rolling(20).mean().bfill()
+    vol_std = v.rolling(20).std().fillna(1)
+
+    return np.column_stack([
+        prices,
+        volumes,
+        log_returns,
+        p.rolling(5).mean().bfill(),
+        p.rolling(5).std().fillna(0),
+        rsi,
+        macd,
+        macd_signal,
+        (volumes - vol_mean) / vol_std,
+    ])
+
+
+def test_build_features_matches_pandas_on_walk_with_flat_stretches():
+    rng = np.random.default_rng(7)
+    steps = rng.standard_normal(400)
+    # Flat runs longer than the rolling-std (5) and RSI (14) windows
+    steps[50:70] = 0.0
+    steps[200:206] = 0.0
+    steps[300:330] = 0.0
+    prices = 100.0 + steps.cumsum()
+    volumes = rng.random(400) * 1e6
+    volumes[120:135] = volumes[119]  # shorter than the volume window, so std stays non-zero
+
+    features = build_features(prices, volumes)
+    expected = _pandas_reference(prices, volumes)
+
+    exact = [c for c in range(features.shape[1]) if c != 4]
+    np.testing.assert_allclose(features[:, exact], expected[:, exact], rtol=1e-9, atol=1e-9)
+    # pandas' rolling std leaves a small rounding residue on flat windows;
+    # the kernel reports them as exactly zero
+    np.testing.assert_allclose(features[:, 4], expected[:, 4], rtol=1e-9, atol=1e-5)
+    flat = np.zeros(len(prices), dtype=bool)
+    for start, stop in ((50, 70), (200, 206), (300, 330)):
+        flat[start + 3:stop] = True  # windows of 5 equal prices
+    assert np.all(features[flat, 4] == 0.0)
+    assert np.all(features[4:][~flat[4:], 4] > 0.0)  # past the zero-filled warm-up
+    # A full RSI window without movement reads exactly 50
+    assert np.all(features[64:70, 5] == 50.0)
+    assert np.all(features[314:330, 5] == 50.0)
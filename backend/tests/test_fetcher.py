@@ -0,0 +1,27 @@
+import pandas as pd
+
+from app.services import fetcher
+
+
+def test_download_history_serves_fresh_cache(tmp_path, monkeypatch):
+    calls = []
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, **kwargs):
+            calls.append(self.symbol)
+            index = pd.date_range("2026-01-12 14:00", periods=3, freq="h")
+            return pd.DataFrame({"Close": [1.0, None, 3.0], "Volume": [10.0, 20.0, 30.0]}, index=index)
+
+    monkeypatch.setattr(fetcher.settings, "HISTORY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(fetcher.yf, "Ticker", FakeTicker)
+    monkeypatch.setattr(fetcher, "_tickers", {})
+
+    first = fetcher._download_history("AAPL", "60d", "60m", "%Y-%m-%d %H:%M")
+    second = fetcher._download_history("AAPL", "60d", "60m", "%Y-%m-%d %H:%M")
+
+    assert calls == ["AAPL"]
+    assert second[0].tolist() == first[0].tolist() == [1.0, 1.0, 3.0]
+    assert second[2] == ["2026-01-12 14:00", "2026-01-12 15:00", "2026-01-12 16:00"]
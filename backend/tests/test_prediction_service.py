@@ -0,0 +1,31 @@
+from app.services.prediction_service import _future_date_strs
+
+
+def test_future_date_strs_skips_weekends():
+    # 2026-01-09 is a Friday
+    dates = _future_date_strs("2026-01-09 22:00", 3)
+    assert dates == ("2026-01-09 23:00", "2026-01-12 00:00", "2026-01-12 01:00")
+
+
+def test_batcher_coalesces_concurrent_requests():
+    import asyncio
+    from app.services.prediction_service import PredictionBatcher
+
+    class FakeModel:
+        def __init__(self):
+            self.calls = []
+
+        def predict_many(self, series, steps):
+            self.calls.append(len(series))
+            return [[prices[-1]] * steps for prices, _, _ in series]
+
+    async def run():
+        model, batcher = FakeModel(), PredictionBatcher()
+        results = await asyncio.gather(*[
+            batcher.submit(model, [float(i)], [1.0], None, steps=2) for i in range(3)
+        ])
+        return model.calls, results
+
+    calls, results = asyncio.run(run())
+    assert calls == [3]
+    assert results == [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0]]
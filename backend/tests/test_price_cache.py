@@ -0,0 +1,108 @@
+import asyncio
+
+import fakeredis
+import numpy as np
+
+from app.services.price_cache import PriceCache
+
+
+def _cache():
+    cache = PriceCache()
+    server = fakeredis.FakeServer()
+    cache.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    cache.redis_raw = fakeredis.FakeAsyncRedis(server=server)
+    cache._connected.set()
+    return cache
+
+
+DATES = ["2026-01-12 14:00", "2026-01-12 15:00", "2026-01-12 16:00"]
+
+
+def test_history_round_trips_as_packed_values():
+    cache = _cache()
+
+    async def run():
+        await cache.save_hourly_history("AAPL", [1.5, 2.5, 3.5], [10.0, 20.0, 30.0], DATES)
+        assert await cache.redis.type("hourly:prices:AAPL") == "string"
+        assert await cache.redis.type("hourly:dates:AAPL") == "string"
+        return await cache.get_hourly_history("AAPL"), await cache.get_hourly_history("AAPL", limit=2)
+
+    (prices, volumes, dates), (last_prices, _, last_dates) = asyncio.run(run())
+    assert prices.tolist() == [1.5, 2.5, 3.5]
+    assert volumes.tolist() == [10.0, 20.0, 30.0]
+    assert dates == DATES
+    assert last_prices.tolist() == [2.5, 3.5]
+    assert last_dates == DATES[1:]
+
+
+def test_missing_and_empty_history_read_as_empty():
+    cache = _cache()
+
+    async def run():
+        await cache.save_daily_history("AAPL", [], [], [])
+        return await cache.get_daily_history("AAPL"), await cache.get_daily_history("MSFT")
+
+    for prices, volumes, dates in asyncio.run(run()):
+        assert len(prices) == 0 and len(volumes) == 0 and dates == []
+
+
+def test_list_typed_keys_from_older_versions_read_as_missing():
+    cache = _cache()
+
+    async def run():
+        await cache.redis.rpush("hourly:prices:AAPL", "1.0", "2.0")
+        await cache.redis.rpush("hourly:dates:AAPL", *DATES[:2])
+        before = await cache.get_hourly_history("AAPL")
+        await cache.save_hourly_history("AAPL", [4.0], [40.0], DATES[:1])
+        return before, await cache.get_hourly_history("AAPL")
+
+    (prices, _, dates), (new_prices, _, new_dates) = asyncio.run(run())
+    assert len(prices) == 0 and dates == []
+    assert new_prices.tolist() == [4.0] and new_dates == DATES[:1]
+
+
+def test_history_reads_are_cached_until_saved_or_expired():
+    cache = _cache()
+
+    async def run():
+        await cache.save_hourly_history("AAPL", [1.0], [10.0], DATES[:1])
+        await cache.get_hourly_history("AAPL")
+        # Written behind the cache's back: not visible while the entry is fresh
+        await cache.redis_raw.set("hourly:prices:AAPL", np.array([9.0]).tobytes())
+        cached = await cache.get_hourly_history("AAPL")
+
+        cache._history_cache[("hourly", "AAPL")] = (0.0, cache._history_cache[("hourly", "AAPL")][1])
+        expired = await cache.get_hourly_history("AAPL")
+
+        await cache.save_hourly_history("AAPL", [2.0], [20.0], DATES[:1])
+        saved = await cache.get_hourly_history("AAPL")
+        return cached, expired, saved
+
+    cached, expired, saved = asyncio.run(run())
+    assert cached[0].tolist() == [1.0]
+    assert expired[0].tolist() == [9.0]
+    assert saved[0].tolist() == [2.0]
+
+
+def test_cached_dates_are_not_shared_between_callers():
+    cache = _cache()
+
+    async def run():
+        await cache.save_hourly_history("AAPL", [1.0, 2.0], [10.0, 20.0], DATES[:2])
+        _, _, dates = await cache.get_hourly_history("AAPL")
+        dates.append("junk")
+        return await cache.get_hourly_dates("AAPL")
+
+    assert asyncio.run(run()) == DATES[:2]
+
+
+def test_history_cache_is_capped():
+    cache = _cache()
+    cache.history_cache_max = 2
+
+    async def run():
+        for symbol in ("A", "B", "C"):
+            await cache.get_hourly_history(symbol)
+
+    asyncio.run(run())
+    assert list(cache._history_cache) == [("hourly", "B"), ("hourly", "C")]
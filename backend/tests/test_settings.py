@@ -0,0 +1,8 @@
+from app.config.settings import Settings
+
+
+def test_add_symbol_dedupes_and_preserves_order():
+    settings = Settings(SYMBOLS=["AAPL", "TSLA"])
+    assert settings.add_symbol("msft") is True
+    assert settings.add_symbol("AAPL") is False
+    assert settings.SYMBOLS == ["AAPL", "TSLA", "MSFT"]